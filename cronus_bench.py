@@ -0,0 +1,319 @@
+"""Throughput benchmark for the wavelength test loop.
+
+Drives a ChannelRun headless on the test engine against cronus_sim.py
+(started in a separate process so client CPU and memory are measured on
+their own) and reports cycles/hour, attempt latency percentiles, HTTP
+requests per attempt, controller overhead and CPU per attempt, and memory
+growth. Results are written as JSON so runs can be compared across commits.
+
+    python cronus_bench.py run --cycles 1000 10000 --accel 1000
+    python cronus_bench.py startup --repeat 10
+    python cronus_bench.py compare bench_results/a.json bench_results/b.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+import cronus_engine as engine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "bench_results")
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def _rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    pos = (len(ordered) - 1) * q
+    lo = int(pos); hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+class SimProcess:
+    def __init__(self, accel, seed, config=None):
+        self.port = _free_port()
+        cmd = [sys.executable, os.path.join(HERE, "cronus_sim.py"), "--port", str(self.port),
+               "--accel", str(accel), "--seed", str(seed)]
+        if config:
+            cmd += ["--config", config]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+        self.url = f"http://127.0.0.1:{self.port}/v0/Cronus"
+
+    def wait_ready(self, transport, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if transport.get_json(f"{self.url}/Status", timeout=0.5):
+                return True
+            time.sleep(0.05)
+        return False
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+def bench_cycles(url, channel, cycles, params_override=None, mem_samples=20):
+    device_range = engine.fetch_device_range(channel)
+    if device_range[0] is None:
+        raise RuntimeError(f"Simulator returned no range for channel {channel}")
+    params = dict(engine.DEFAULT_PARAMS)
+    params.update({"test_min": None, "test_max": None, "wait_time": 0.0, "cycles": cycles,
+                   "measure_power_curve": False, "dwell_mode": "ready"})
+    params.update(params_override or {})
+    latencies = []
+    failures = [0]
+    mem = []
+    sample_every = max(1, cycles // mem_samples)
+    def emit(name, *args):
+        if name == "update_status":
+            success, duration, _ = args
+            latencies.append(duration)
+            failures[0] += 0 if success else 1
+            if len(latencies) % sample_every == 0:
+                mem.append((len(latencies), _rss_bytes()))
+    stats_before = engine.TRANSPORT.get_json(f"{url}/Sim/Stats")
+    run = engine.ChannelRun(channel, params, device_range, emit=emit)
+    rss_before = _rss_bytes()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    engine.ENGINE.start(run).wait()
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = _rss_bytes()
+    stats_after = engine.TRANSPORT.get_json(f"{url}/Sim/Stats")
+    n = len(latencies)
+    ordered = sorted(latencies)
+    requests = stats_after["requests"] - stats_before["requests"]
+    tuning_real = stats_after["tuning_real_s"] - stats_before["tuning_real_s"]
+    return {
+        "cycles": n,
+        "failures": failures[0],
+        "wall_s": wall,
+        "cycles_per_hour": n / wall * 3600 if wall else None,
+        "attempt_latency_s": {
+            "mean": sum(latencies) / n if n else None,
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "p99": _percentile(ordered, 0.99),
+            "max": ordered[-1] if ordered else None
+        },
+        "requests_per_attempt": requests / n if n else None,
+        "tuning_real_s": tuning_real,
+        "controller_overhead_per_attempt_s": (wall - tuning_real) / n if n else None,
+        "cpu_per_attempt_ms": cpu / n * 1000 if n else None,
+        "rss_before_bytes": rss_before,
+        "rss_after_bytes": rss_after,
+        "rss_growth_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+        "rss_samples": mem
+    }
+
+def cmd_run(args):
+    log_dir = tempfile.mkdtemp(prefix="cronus_bench_")
+    engine.set_log_dir(log_dir)
+    sim = SimProcess(args.accel, args.seed, args.sim_config) if not args.url else None
+    url = args.url or sim.url
+    engine.TRANSPORT.base_url = url.rstrip("/")
+    try:
+        if sim and not sim.wait_ready(engine.TRANSPORT):
+            print("Simulator did not start", file=sys.stderr)
+            return 2
+        results = []
+        for cycles in args.cycles:
+            print(f"Running {cycles} cycles on Ch{args.channel}...", flush=True)
+            r = bench_cycles(url, args.channel, cycles, {"dwell_mode": args.dwell_mode,
+                                                          "sequence": args.sequence,
+                                                          "jump_profile": args.jump_profile})
+            results.append(r)
+            lat = r["attempt_latency_s"]
+            print(f"  {r['cycles_per_hour']:.0f} cycles/h  p50 {lat['p50']*1000:.1f} ms  "
+                  f"p95 {lat['p95']*1000:.1f} ms  p99 {lat['p99']*1000:.1f} ms  "
+                  f"{r['requests_per_attempt']:.2f} req/attempt  "
+                  f"tuning {r['tuning_real_s']:.1f} s  "
+                  f"overhead {r['controller_overhead_per_attempt_s']*1000:.1f} ms  "
+                  f"cpu {r['cpu_per_attempt_ms']:.2f} ms/attempt  "
+                  f"rss +{(r['rss_growth_bytes'] or 0)/1e6:.1f} MB", flush=True)
+    finally:
+        if sim:
+            sim.stop()
+        engine.ENGINE.shutdown()
+    report = {
+        "kind": "throughput",
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"accel": args.accel, "seed": args.seed, "channel": args.channel,
+                     "dwell_mode": args.dwell_mode,
+                     "sequence": args.sequence, "jump_profile": args.jump_profile, "url": args.url, "sim_config": args.sim_config},
+        "results": results
+    }
+    _save(report, args.out)
+    return 0
+
+STARTUP_SNIPPET = """
+import sys, json, time
+t0 = time.perf_counter()
+sys.path.insert(0, {here!r})
+import demo
+t1 = time.perf_counter()
+demo.MainWindow.open_settings = lambda self: None  # no device: skip the modal range prompt
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtWidgets import QApplication
+class FirstPaint(QObject):
+    # when each watched widget first receives a paint event
+    def __init__(self, widgets):
+        super().__init__()
+        self.at = {{}}
+        for w in widgets:
+            w.installEventFilter(self)
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self.at.setdefault(obj, time.perf_counter())
+        return False
+app = QApplication(sys.argv)
+win = demo.MainWindow()
+charts = [win.ch1_panel.chart, win.ch2_panel.chart, win.map_view]
+probe = FirstPaint([win] + charts)
+win.resize(1920, 1200)  # as maximized on a typical bench screen, so both channel panels are on screen
+win.show()
+while not all(w in probe.at for w in [win] + charts):
+    app.processEvents()
+print(json.dumps({{"import_s": t1 - t0, "first_paint_s": probe.at[win] - t1,
+                  "charts_ready_s": max(probe.at[w] for w in charts) - t1, "modules": len(sys.modules)}}))
+"""
+
+def cmd_startup(args):
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    samples = []
+    for i in range(args.repeat):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", STARTUP_SNIPPET.format(here=HERE)], env=env,
+                             capture_output=True, text=True, timeout=120, cwd=tempfile.gettempdir())
+        total = time.perf_counter() - started
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if out.returncode != 0 or not lines:
+            print(out.stderr, file=sys.stderr)
+            return 2
+        sample = json.loads(lines[-1])
+        sample["process_s"] = total
+        samples.append(sample)
+        print(f"  run {i + 1}: import {sample['import_s']*1000:.0f} ms  "
+              f"first paint {sample['first_paint_s']*1000:.0f} ms  charts {sample['charts_ready_s']*1000:.0f} ms  "
+              f"process {total*1000:.0f} ms", flush=True)
+    summary = {}
+    for key in ("import_s", "first_paint_s", "charts_ready_s", "process_s", "modules"):
+        ordered = sorted(s[key] for s in samples)
+        summary[key] = {"p50": _percentile(ordered, 0.5), "min": ordered[0], "max": ordered[-1]}
+    print(f"median: import {summary['import_s']['p50']*1000:.0f} ms  "
+          f"first paint {summary['first_paint_s']['p50']*1000:.0f} ms  "
+          f"charts {summary['charts_ready_s']['p50']*1000:.0f} ms  "
+          f"process {summary['process_s']['p50']*1000:.0f} ms  modules {summary['modules']['p50']:.0f}")
+    report = {
+        "kind": "startup",
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"repeat": args.repeat, "offscreen": args.offscreen},
+        "results": [dict(summary, label="startup")]
+    }
+    _save(report, args.out)
+    return 0
+
+def _save(report, out):
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{report['kind']}_{ts}_{report['commit'] or 'nocommit'}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {out}")
+
+def _flatten(obj, prefix=""):
+    flat = {}
+    for key, value in obj.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def cmd_compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    for old_r, new_r in zip(base["results"], new["results"]):
+        label = old_r.get("cycles", old_r.get("label", ""))
+        print(f"[{label}]")
+        old_f, new_f = _flatten(old_r), _flatten(new_r)
+        for key in old_f:
+            if key in new_f and old_f[key]:
+                change = (new_f[key] - old_f[key]) / abs(old_f[key]) * 100
+                print(f"  {key:40s} {old_f[key]:>14.4g} {new_f[key]:>14.4g} {change:+8.1f}%")
+    return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cronus test-loop benchmarks")
+    sub = ap.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="throughput benchmark against the simulator")
+    run.add_argument("--cycles", type=int, nargs="+", default=[1000])
+    run.add_argument("--channel", type=int, default=1)
+    run.add_argument("--accel", type=float, default=1000.0)
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--dwell-mode", default="ready", choices=["fixed", "ready"])
+    run.add_argument("--sequence", default="random", choices=engine.SEQUENCE_STRATEGIES)
+    run.add_argument("--jump-profile", default="none", choices=engine.JUMP_PROFILES)
+    run.add_argument("--sim-config", help="simulator config JSON")
+    run.add_argument("--url", help="benchmark an already running API instead of spawning the simulator")
+    run.add_argument("--out", help="result JSON path (default: bench_results/)")
+    run.set_defaults(func=cmd_run)
+    st = sub.add_parser("startup", help="GUI cold-start time (import + first paint) in fresh interpreters")
+    st.add_argument("--repeat", type=int, default=5)
+    st.add_argument("--offscreen", action="store_true", help="use the offscreen Qt platform")
+    st.add_argument("--out", help="result JSON path (default: bench_results/)")
+    st.set_defaults(func=cmd_startup)
+    cmp_ = sub.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.set_defaults(func=cmd_compare)
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
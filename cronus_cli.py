@@ -0,0 +1,264 @@
+"""Headless Cronus test runner for unattended rack stations.
+
+Loads cronus_app_config.json through load_config, runs the configured
+channels on the test engine without Qt, streams one line per attempt to
+stdout and writes the results CSV (plus power curve, if measured) to the
+log directory. Every attempt is also journaled there, and --resume picks
+up an interrupted run from its journal. Exit code 0 means every channel
+met --min-success-rate, 1 means at least one did not, 2 means a channel
+could not be started.
+
+    python cronus_cli.py --channels 1 2 --cycles 500 --min-success-rate 99
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from datetime import datetime
+
+import cronus_engine as engine
+
+EXIT_PASS = 0
+EXIT_FAIL = 1
+EXIT_ERROR = 2
+
+class ConsoleReporter:
+    """Engine event sink that prints attempts as text or JSON lines."""
+    def __init__(self, channel, as_json=False, quiet=False, stream=None):
+        self.channel = channel
+        self.as_json = as_json
+        self.quiet = quiet
+        self.stream = stream or sys.stdout
+        self.power_curve = []
+        self.eta = None
+        self.qualification = None
+        self.retest_regions = []
+
+    def __call__(self, name, *args):
+        if name == "update_status":
+            success, duration, wl = args
+            obj = {"event": "attempt", "wavelength": wl, "success": success, "duration": round(duration, 3)}
+            text = f"{wl:7.1f} nm  {'OK  ' if success else 'FAIL'}  {duration:6.2f} s"
+            if self.eta is not None:
+                eta, low, high = self.eta
+                obj.update({"eta_s": round(eta), "eta_low_s": round(low), "eta_high_s": round(high)})
+                text += f"  ETA {format_eta(eta)} ±{format_eta((high - low) / 2)}"
+            self._line(obj, text)
+        elif name == "qualification_decided":
+            decision, attempts, saved = args
+            self.qualification = {"decision": decision, "attempts": attempts, "saved_s": round(saved, 1)}
+            self._line({"event": "qualification", **self.qualification},
+                       f"qualification {decision.upper()} after {attempts} attempts, "
+                       f"~{format_eta(saved)} of bench time saved", force=True)
+        elif name == "retest_finished":
+            self.retest_regions = args[0]
+            for r in self.retest_regions:
+                self._line({"event": "retest_region", **r},
+                           f"retest {r['lo']:.1f}-{r['hi']:.1f} nm: {r['classification']} "
+                           f"(fails {r['fail_rate']:.0%} of re-tests, edges {r['edge_fail_rate']:.0%})", force=True)
+        elif name == "run_estimate":
+            self.eta = args
+        elif name == "link_state":
+            state = "connection_restored" if args[0] else "connection_lost"
+            self._line({"event": state}, state.replace("_", " "), force=True)
+        elif name == "power_curve_finished":
+            self.power_curve = args[0]
+            self._line({"event": "power_curve", "points": len(self.power_curve)},
+                       f"power curve: {len(self.power_curve)} points")
+
+    def _line(self, obj, text, force=False):
+        if self.quiet and not force:
+            return
+        ts = datetime.now().strftime("%H:%M:%S")
+        if self.as_json:
+            obj.update({"channel": self.channel, "time": ts})
+            self.stream.write(json.dumps(obj) + "\n")
+        else:
+            self.stream.write(f"[{ts}] Ch{self.channel}  {text}\n")
+        self.stream.flush()
+
+def format_eta(seconds):
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h}h{m:02d}m" if h else f"{m}m{s:02d}s"
+
+def apply_overrides(params, args):
+    """Copy of ``params`` with the flags shared by cronus_cli and cronus_fleet applied, re-validated
+    so command-line overrides get the same clamps as the config file."""
+    params = dict(params)
+    if args.cycles is not None:
+        params["cycles"] = args.cycles
+    if args.wait_time is not None:
+        params["wait_time"] = args.wait_time
+    if args.dwell_mode:
+        params["dwell_mode"] = args.dwell_mode
+    if args.sequence:
+        params["sequence"] = args.sequence
+    if args.jump_profile:
+        params["jump_profile"] = args.jump_profile
+    if args.target_jump is not None:
+        params["target_jump"] = args.target_jump
+    if args.qualify:
+        params["qualification"] = True
+    for key in ("spec_rate", "qual_margin", "qual_confidence"):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    if args.retest:
+        params["retest"] = True
+    if args.retest_repeats is not None:
+        params["retest_repeats"] = args.retest_repeats
+    if args.retest_radius is not None:
+        params["retest_radius"] = args.retest_radius
+    if args.abort_on_stop:
+        params["abort_on_stop"] = True
+    if args.no_power_curve:
+        params["measure_power_curve"] = False
+    return engine.merge_channel(params)
+
+def channel_verdict(run, min_success_rate):
+    """(passed, verdict) for a finished run. A run that did not finish never passes, and a qualification
+    run that used up its cycles undecided is judged against its spec rate, not --min-success-rate."""
+    results = run.results
+    total = len(results)
+    rate = results.success_count / total * 100 if total else 0.0
+    if run.end_reason in (None, "stopped"):
+        return False, "INTERRUPTED"
+    if run.end_reason in ("unreachable", "error"):
+        return False, run.end_reason.upper()
+    if run.qualification and run.qualification.decision:
+        return run.qualification.decision == "pass", run.qualification.decision.upper()
+    if run.qualification:
+        spec = run.params.get("spec_rate", engine.DEFAULT_PARAMS["spec_rate"])
+        passed = total > 0 and rate >= spec
+        return passed, f"{'PASS' if passed else 'FAIL'} (undecided, judged against the {spec:g}% spec)"
+    passed = total > 0 and rate >= min_success_rate
+    return passed, "PASS" if passed else "FAIL"
+
+def _resolve_params(cfg, channel, args):
+    return apply_overrides(cfg.get(f"ch{channel}", engine.DEFAULT_PARAMS), args)
+
+def _write_power_curve(path, data):
+    with open(path, "w", newline='', encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Wavelength (nm)", "Power (mW)"])
+        for p in data:
+            w.writerow([p["wavelength"], p["power"]])
+
+def run(args):
+    cfg = engine.load_config(args.config)
+    if args.log_dir:
+        engine.set_log_dir(args.log_dir)
+    if args.api:
+        engine.TRANSPORT.base_url = args.api.rstrip("/")
+    runs = []
+    exit_code = EXIT_PASS
+    ranges = engine.fetch_device_ranges(args.channels)
+    for ch in args.channels:
+        device_range = ranges[ch]
+        if device_range[0] is None:
+            print(f"Ch{ch}: device range unavailable at {engine.TRANSPORT.base_url}", file=sys.stderr)
+            exit_code = EXIT_ERROR
+            continue
+        reporter = ConsoleReporter(ch, as_json=args.json, quiet=args.quiet)
+        resume = engine.find_resumable_journal(ch) if args.resume else None
+        if resume:
+            reporter._line({"event": "resume", "journal": resume.path, "attempts": len(resume.results)},
+                           f"resuming {len(resume.results)} attempts from {resume.path}", force=True)
+            params = resume.params
+        else:
+            params = _resolve_params(cfg, ch, args)
+        run = engine.ChannelRun(ch, params, device_range, emit=reporter, resume=resume,
+                                zones=engine.zone_bounds(cfg["zones"]), reconnect_timeout=args.reconnect_timeout or None)
+        runs.append((run, reporter))
+    if not runs:
+        return EXIT_ERROR
+    started = time.monotonic()
+    done = [engine.ENGINE.start(run) for run, _ in runs]
+    try:
+        while not all(d.wait(0.2) for d in done):
+            pass
+    except KeyboardInterrupt:
+        print("Interrupted, stopping...", file=sys.stderr)
+        for run, _ in runs:
+            engine.ENGINE.cancel(run)
+        for d in done:
+            d.wait(5)
+        exit_code = EXIT_FAIL
+    elapsed = time.monotonic() - started
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary = []
+    for run, reporter in runs:
+        results = run.results
+        total = len(results)
+        ok = results.success_count
+        rate = ok / total * 100 if total else 0.0
+        passed, verdict = channel_verdict(run, args.min_success_rate)
+        if not passed and exit_code == EXIT_PASS:
+            exit_code = EXIT_FAIL
+        csv_path = os.path.join(engine.LOG_BASE, f"Ch{run.channel}_TestResults_{ts}.csv")
+        engine.write_results_csv(csv_path, results)
+        if reporter.power_curve:
+            _write_power_curve(os.path.join(engine.LOG_BASE, f"Ch{run.channel}_PowerCurve_{ts}.csv"),
+                               reporter.power_curve)
+        summary.append({"channel": run.channel, "attempts": total, "success": ok, "failed": total - ok,
+                        "success_rate": round(rate, 2), "passed": passed, "verdict": verdict, "results_csv": csv_path,
+                        "coverage": round(run.sequence.coverage.fraction * 100, 2),
+                        "fail_log": run.fail_log_file, "qualification": reporter.qualification,
+                        "retest_regions": reporter.retest_regions})
+    if args.json:
+        print(json.dumps({"event": "summary", "elapsed_s": round(elapsed, 1), "channels": summary}))
+    else:
+        for s in summary:
+            qual = s["qualification"]
+            verdict = s["verdict"] + (f" (qualified early, ~{format_eta(qual['saved_s'])} saved)"
+                                      if qual and s["verdict"] in ("PASS", "FAIL") else "")
+            print(f"Ch{s['channel']}: {s['success']}/{s['attempts']} ok ({s['success_rate']:.1f}%), "
+                  f"{s['coverage']:.1f}% of range covered -> {verdict}  [{s['results_csv']}]")
+        print(f"Elapsed {elapsed:.1f} s")
+    engine.ENGINE.shutdown()
+    engine.LOG_WRITER.shutdown()
+    engine.TRANSPORT.close()
+    return exit_code
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Run Cronus wavelength tests without the GUI")
+    ap.add_argument("--channels", type=int, nargs="+", default=[1, 2])
+    ap.add_argument("--config", help=f"config file (default: {engine.CONFIG_PATH})")
+    ap.add_argument("--api", help=f"API base URL (default: {engine.API_BASE})")
+    ap.add_argument("--log-dir", help="override log_dir from the config")
+    ap.add_argument("--cycles", type=int, help="override cycles (0 = until interrupted)")
+    ap.add_argument("--wait-time", type=float, help="override post-set wait (s)")
+    ap.add_argument("--dwell-mode", choices=engine.DWELL_MODES)
+    ap.add_argument("--sequence", choices=engine.SEQUENCE_STRATEGIES, help="wavelength ordering strategy")
+    ap.add_argument("--jump-profile", choices=engine.JUMP_PROFILES,
+                    help="reorder wavelengths by jump size (min_travel = shortest total tuning travel)")
+    ap.add_argument("--target-jump", type=float, help="jump size (nm) for --jump-profile target")
+    ap.add_argument("--no-power-curve", action="store_true")
+    ap.add_argument("--min-success-rate", type=float, default=100.0,
+                    help="percent of attempts that must succeed for a channel to pass")
+    ap.add_argument("--qualify", action="store_true",
+                    help="stop each channel as soon as a sequential test settles pass/fail against --spec-rate")
+    ap.add_argument("--spec-rate", type=float, help="qualification spec success rate (%%)")
+    ap.add_argument("--qual-margin", type=float, help="indifference margin around the spec (%% points)")
+    ap.add_argument("--qual-confidence", type=float, help="confidence of the qualification decision (%%)")
+    ap.add_argument("--retest", action="store_true",
+                    help="after the run, re-test failure regions and classify them intermittent or systematic")
+    ap.add_argument("--retest-repeats", type=int, help="re-tests per wavelength in the retest phase")
+    ap.add_argument("--retest-radius", type=float, help="nm around each failure region to probe (and merge within)")
+    ap.add_argument("--abort-on-stop", action="store_true",
+                    help="on Ctrl+C, send each channel's abort_path to stop an in-progress tuning")
+    ap.add_argument("--reconnect-timeout", type=float, default=300.0,
+                    help="end a channel after the device has been unreachable this many seconds (0 = wait forever)")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue each channel's newest unfinished run journal in the log directory")
+    ap.add_argument("--json", action="store_true", help="stream JSON lines instead of text")
+    ap.add_argument("--quiet", action="store_true", help="only print the summary")
+    return ap
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1822 @@
+"""Qt-free Cronus test runtime: configuration, HTTP transport and the test engine.
+
+Shared by the GUI (demo.py), the headless runner (cronus_cli.py) and the
+benchmarks; nothing here may import Qt, matplotlib or reportlab.
+"""
+import os
+import re
+import csv
+import glob
+import json
+import math
+import time
+import queue
+import atexit
+import asyncio
+import random
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = "http://127.0.0.1:35100/v0/Cronus"
+
+DEFAULT_PARAMS = {
+    "test_min": None,
+    "test_max": None,
+    "wait_time": 3.0,
+    "cycles": 100,
+    "measure_power_curve": False,
+    "dwell_mode": "fixed",
+    "power_stability": False,
+    "sequence": "random",
+    "jump_profile": "none",
+    "target_jump": 50.0,
+    "qualification": False,
+    "spec_rate": 95.0,
+    "qual_margin": 3.0,
+    "qual_confidence": 95.0,
+    "retest": False,
+    "retest_repeats": 3,
+    "retest_radius": 0.5,
+    "abort_on_stop": False,
+    "abort_path": "/Ch{channel}/Abort"
+}
+
+DWELL_MODES = ("fixed", "ready")
+SEQUENCE_STRATEGIES = ("random", "halton", "stratified", "shuffled")
+JUMP_PROFILES = ("none", "min_travel", "max_jump", "target")
+
+CONFIG_FILENAME = "cronus_app_config.json"
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILENAME)
+LOG_BASE = "D:/CronusTestingLogs"
+
+BASE_ZONE_DEFS = [
+    {"fixed_min": 670.0,   "fixed_max": 800.0,   "color": "#9ec5fe"},
+    {"fixed_min": 800.1,   "fixed_max": 960.0,   "color": "#d6bcfa"},
+    {"fixed_min": 940.0,   "fixed_max": 1100.0,  "color": "#fecaca"},
+    {"fixed_min": 1100.1,  "fixed_max": 1320.0,  "color": "#c8facc"},
+]
+
+def ensure_log_dirs():
+    os.makedirs(LOG_BASE, exist_ok=True)
+    return LOG_BASE
+
+def set_log_dir(new_dir: str):
+    global LOG_BASE
+    if new_dir:
+        try:
+            os.makedirs(new_dir, exist_ok=True)
+            LOG_BASE = new_dir
+        except Exception as e:
+            print(f"Failed to create log directory {new_dir}: {e}")
+    ensure_log_dirs()
+
+DEFAULT_HTTP = {
+    "pool_size": 4,
+    "keep_alive": True,
+    # Per-endpoint timeouts (seconds), keyed by the last path segment
+    "timeouts": {
+        "Status": 2.0,
+        "Mode": 2.0,
+        "WavelengthRange": 2.0,
+        "Power": 2.0,
+        "Wavelength": 3.0,
+        "Off": 3.0
+    },
+    "default_timeout": 2.0
+}
+
+class CronusTransport:
+    """Keep-alive HTTP transport: one pooled requests.Session per calling thread.
+
+    Callables in link_observers hear observer(reachable) about the link
+    itself: False on a connection error or timeout, True on a successful
+    response. An HTTP error status says nothing about the link (it may be
+    one channel's endpoint failing) and is not reported.
+    """
+    def __init__(self, base_url=API_BASE, pool_size=None, keep_alive=None, timeouts=None, default_timeout=None):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = DEFAULT_HTTP["pool_size"]
+        self.keep_alive = DEFAULT_HTTP["keep_alive"]
+        self.timeouts = dict(DEFAULT_HTTP["timeouts"])
+        self.default_timeout = DEFAULT_HTTP["default_timeout"]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._generation = 0
+        self._status_cache = None
+        self.link_observers = []
+        self.configure(pool_size, keep_alive, timeouts, default_timeout)
+
+    def configure(self, pool_size=None, keep_alive=None, timeouts=None, default_timeout=None):
+        if pool_size is not None:
+            self.pool_size = max(1, int(pool_size))
+        if keep_alive is not None:
+            self.keep_alive = bool(keep_alive)
+        if isinstance(timeouts, dict):
+            for name, value in timeouts.items():
+                try:
+                    self.timeouts[name] = float(value)
+                except (TypeError, ValueError):
+                    pass
+        if default_timeout is not None:
+            self.default_timeout = float(default_timeout)
+        # Sessions built with the old settings are dropped lazily by each thread
+        self.close()
+
+    def _session(self):
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if not self.keep_alive:
+                session.headers["Connection"] = "close"
+            local.session = session
+            local.generation = self._generation
+            with self._lock:
+                # Callers come and go (short-lived pools, asyncio.to_thread): close the sessions of threads
+                # that have exited, or each would hold its keep-alive sockets open until close()
+                stale = [self._sessions.pop(t) for t in list(self._sessions) if not t.is_alive()]
+                self._sessions[threading.current_thread()] = session
+            for s in stale:
+                try: s.close()
+                except Exception: pass
+        return local.session
+
+    @property
+    def status_cache(self):
+        """The StatusCache, and with it the link monitor, shared by every reader of this transport."""
+        with self._lock:
+            if self._status_cache is None:
+                self._status_cache = StatusCache(self)
+            return self._status_cache
+
+    def url(self, path):
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}{path}"
+
+    def timeout_for(self, path):
+        endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def get_json(self, path, timeout=None):
+        return self._request("get", path, timeout)
+
+    def put_json(self, path, payload, timeout=None):
+        return self._request("put", path, timeout, json=payload)
+
+    def _request(self, method, path, timeout, **kwargs):
+        try:
+            r = getattr(self._session(), method)(self.url(path), timeout=timeout or self.timeout_for(path), **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self._report_link(False)
+            return None
+        except Exception:
+            return None
+        if r.ok:
+            self._report_link(True)
+        try:
+            r.raise_for_status()
+            return r.json()
+        except Exception:
+            return None
+
+    def _report_link(self, reachable):
+        for observer in self.link_observers:
+            try:
+                observer(reachable)
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+            self._generation += 1
+        for s in sessions:
+            try: s.close()
+            except Exception: pass
+
+TRANSPORT = CronusTransport()
+
+def configure_transport(http_cfg):
+    if not isinstance(http_cfg, dict):
+        http_cfg = {}
+    TRANSPORT.configure(
+        pool_size=http_cfg.get("pool_size"),
+        keep_alive=http_cfg.get("keep_alive"),
+        timeouts=http_cfg.get("timeouts"),
+        default_timeout=http_cfg.get("default_timeout")
+    )
+    return {
+        "pool_size": TRANSPORT.pool_size,
+        "keep_alive": TRANSPORT.keep_alive,
+        "timeouts": dict(TRANSPORT.timeouts),
+        "default_timeout": TRANSPORT.default_timeout
+    }
+
+def safe_get_json(url, timeout=None):
+    return TRANSPORT.get_json(url, timeout)
+
+def safe_put_json(url, payload, timeout=None):
+    return TRANSPORT.put_json(url, payload, timeout)
+
+class ConnectionMonitor:
+    """Online/offline state of one device link, shared by every run on it.
+
+    Fed through report() by the transport's link_observers (connection
+    errors, timeouts and successful responses) and by every read of the
+    device-wide PROBE_PATH. A failing per-channel endpoint is not a link
+    failure and never reaches it. The first failure flips
+    the link offline, notifies listeners once (callback(online)) and starts
+    a single prober that reads PROBE_PATH with jittered exponential backoff.
+    The first answer from any source flips it back online and wakes every
+    wait_online() caller at once.
+    """
+    PROBE_PATH = "/Status"
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30.0
+    JITTER = 0.25
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.online = True
+        self.lost_at = None
+        self.probes = 0
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._waiters = set()
+        self._prober = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def backoff(cls, attempt):
+        """Delay before probe number `attempt` (0-based), with +/- JITTER spread."""
+        delay = min(cls.BACKOFF_MAX, cls.BACKOFF_BASE * 2 ** attempt)
+        return delay * random.uniform(1 - cls.JITTER, 1 + cls.JITTER)
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def report(self, ok):
+        with self._lock:
+            if ok == self.online:
+                return
+            self.online = ok
+            listeners = list(self._listeners)
+            if ok:
+                self.lost_at = None
+                waiters, self._waiters = self._waiters, set()
+            else:
+                self.lost_at = time.monotonic()
+                waiters = ()
+                if self._prober is None or not self._prober.is_alive():
+                    self._prober = threading.Thread(target=self._probe, name="CronusLinkProber", daemon=True)
+                    self._prober.start()
+        for loop, fut in waiters:
+            try:
+                loop.call_soon_threadsafe(lambda f=fut: f.done() or f.set_result(True))
+            except RuntimeError:
+                pass
+        for callback in listeners:
+            try:
+                callback(ok)
+            except Exception:
+                pass
+
+    def _probe(self):
+        attempt = 0
+        while not self._stop.wait(self.backoff(attempt)):
+            with self._lock:
+                # Decide to exit under the lock: a drop reported after this finds no prober and starts one
+                if self.online:
+                    self._prober = None
+                    return
+            self.probes += 1
+            self.cache.get(self.PROBE_PATH)
+            attempt += 1
+
+    async def wait_online(self, timeout=None):
+        """Return True as soon as the link is online, or False after `timeout` seconds."""
+        if self.online:
+            return True
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        entry = (loop, fut)
+        with self._lock:
+            if self.online:
+                return True
+            self._waiters.add(entry)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(entry)
+
+    def shutdown(self):
+        self._stop.set()
+
+class StatusCache:
+    """Single owner of device status reads for one transport.
+
+    get() returns the last snapshot of a path if it is younger than max_age,
+    otherwise fetches it. Concurrent fetches of the same path share one
+    request (single flight). Every fetched snapshot is timestamped
+    (time.monotonic()) and published to subscribers as callback(path, data,
+    ts) on the fetching thread; data is None when the device did not answer.
+    """
+    POLL_INTERVAL = 3.0
+
+    def __init__(self, api=None):
+        self.api = api or TRANSPORT
+        self.requests = 0
+        self.hits = 0
+        self._snapshots = {}
+        self._inflight = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._poll_stop = threading.Event()
+        self._poller = None
+        self.link = ConnectionMonitor(self)
+        if hasattr(self.api, "link_observers"):
+            self.api.link_observers.append(self.link.report)
+
+    def get(self, path, max_age=0.0):
+        with self._lock:
+            snap = self._snapshots.get(path)
+            if snap is not None and time.monotonic() - snap[1] <= max_age:
+                self.hits += 1
+                return snap[0]
+            pending = self._inflight.get(path)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[path] = threading.Event()
+        if not owner:
+            # Join the request already in flight instead of sending a second one. It may have been sent
+            # before this call, so the answer can be up to one request round-trip older than max_age allows
+            pending.wait()
+            with self._lock:
+                self.hits += 1
+                return self._snapshots[path][0]
+        try:
+            data = self.api.get_json(path)
+        except Exception:
+            data = None
+        ts = time.monotonic()
+        with self._lock:
+            self._snapshots[path] = (data, ts)
+            self.requests += 1
+            del self._inflight[path]
+            subscribers = list(self._subscribers)
+        pending.set()
+        if path == self.link.PROBE_PATH:
+            self.link.report(data is not None)
+        for callback in subscribers:
+            try:
+                callback(path, data, ts)
+            except Exception:
+                pass
+        return data
+
+    def snapshot(self, path):
+        """(data, ts) of the last fetch of `path`, or (None, None)."""
+        with self._lock:
+            return self._snapshots.get(path, (None, None))
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start_polling(self, paths, interval=None):
+        """Refresh `paths` in a daemon thread. Later paths are only read while the first one answers OK,
+        and a path someone else read within the interval is not fetched again."""
+        interval = interval or self.POLL_INTERVAL
+        self.stop_polling()
+        self._poll_stop = threading.Event()
+        stop = self._poll_stop
+        def _loop():
+            while not stop.is_set():
+                head = self.get(paths[0], interval * 0.9)
+                if head is not None and head.get("OK", False):
+                    for path in paths[1:]:
+                        self.get(path, interval * 0.9)
+                stop.wait(interval)
+        self._poller = threading.Thread(target=_loop, name="CronusStatusPoller", daemon=True)
+        self._poller.start()
+
+    def stop_polling(self, timeout=None):
+        self._poll_stop.set()
+        if self._poller is not None:
+            self._poller.join(timeout)
+            self._poller = None
+
+STATUS_CACHE = TRANSPORT.status_cache
+
+def fetch_device_range(channel: int, api=None):
+    rng = (api or TRANSPORT).get_json(f"/Ch{channel}/WavelengthRange")
+    if rng and rng.get("OK") and not rng.get("IsEmpty"):
+        try:
+            return (float(rng.get("Min")), float(rng.get("Max")))
+        except:
+            return (None, None)
+    return (None, None)
+
+def fetch_device_ranges(channels, api=None, on_result=None):
+    """Read several channel ranges concurrently; on_result(channel, range) fires as each one arrives."""
+    channels = list(channels)
+    ranges = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(channels)), thread_name_prefix="cronus-range") as pool:
+        futures = {pool.submit(fetch_device_range, ch, api): ch for ch in channels}
+        for fut in as_completed(futures):
+            ch = futures[fut]
+            ranges[ch] = fut.result()
+            if on_result:
+                on_result(ch, ranges[ch])
+    return ranges
+
+def merge_channel(raw):
+    """Channel test params from a raw config dict, with defaults filled in and dwell_mode validated."""
+    merged = {}
+    merged["test_min"] = raw.get("test_min", None)
+    merged["test_max"] = raw.get("test_max", None)
+    merged["wait_time"] = raw.get("wait_time", DEFAULT_PARAMS["wait_time"])
+    merged["cycles"] = raw.get("cycles", DEFAULT_PARAMS["cycles"])
+    merged["measure_power_curve"] = raw.get("measure_power_curve", DEFAULT_PARAMS["measure_power_curve"])
+    dwell_mode = raw.get("dwell_mode", DEFAULT_PARAMS["dwell_mode"])
+    merged["dwell_mode"] = dwell_mode if dwell_mode in DWELL_MODES else DEFAULT_PARAMS["dwell_mode"]
+    merged["power_stability"] = bool(raw.get("power_stability", DEFAULT_PARAMS["power_stability"]))
+    sequence = raw.get("sequence", DEFAULT_PARAMS["sequence"])
+    merged["sequence"] = sequence if sequence in SEQUENCE_STRATEGIES else DEFAULT_PARAMS["sequence"]
+    profile = raw.get("jump_profile", DEFAULT_PARAMS["jump_profile"])
+    merged["jump_profile"] = profile if profile in JUMP_PROFILES else DEFAULT_PARAMS["jump_profile"]
+    try:
+        merged["target_jump"] = max(0.0, float(raw.get("target_jump", DEFAULT_PARAMS["target_jump"])))
+    except (TypeError, ValueError):
+        merged["target_jump"] = DEFAULT_PARAMS["target_jump"]
+    merged["qualification"] = bool(raw.get("qualification", DEFAULT_PARAMS["qualification"]))
+    for key, lo, hi in (("spec_rate", 1.0, 100.0), ("qual_margin", 0.01, 50.0), ("qual_confidence", 80.0, 99.99)):
+        try:
+            merged[key] = min(hi, max(lo, float(raw.get(key, DEFAULT_PARAMS[key]))))
+        except (TypeError, ValueError):
+            merged[key] = DEFAULT_PARAMS[key]
+    merged["retest"] = bool(raw.get("retest", DEFAULT_PARAMS["retest"]))
+    try:
+        merged["retest_repeats"] = max(1, int(raw.get("retest_repeats", DEFAULT_PARAMS["retest_repeats"])))
+    except (TypeError, ValueError):
+        merged["retest_repeats"] = DEFAULT_PARAMS["retest_repeats"]
+    try:
+        merged["retest_radius"] = max(0.0, float(raw.get("retest_radius", DEFAULT_PARAMS["retest_radius"])))
+    except (TypeError, ValueError):
+        merged["retest_radius"] = DEFAULT_PARAMS["retest_radius"]
+    merged["abort_on_stop"] = bool(raw.get("abort_on_stop", DEFAULT_PARAMS["abort_on_stop"]))
+    abort_path = raw.get("abort_path", DEFAULT_PARAMS["abort_path"])
+    merged["abort_path"] = abort_path if isinstance(abort_path, str) and abort_path.startswith("/") \
+        else DEFAULT_PARAMS["abort_path"]
+    return merged
+
+def zone_bounds(zones_cfg):
+    """(min, max) of each enabled zone in a config "zones" list."""
+    return [(float(z["min"]), float(z["max"])) for z in zones_cfg or () if z.get("enabled", True)]
+
+def load_config(path=None):
+    global LOG_BASE
+    path = path or CONFIG_PATH
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+    else:
+        data = {}
+    LOG_BASE = data.get("log_dir", LOG_BASE)
+    ensure_log_dirs()
+    http_cfg = configure_transport(data.get("http"))
+
+    # Zones
+    zones_cfg = data.get("zones")
+    def default_zone_list():
+        return [
+            {"name": "VIS1", "enabled": True, "min": BASE_ZONE_DEFS[0]["fixed_min"], "max": BASE_ZONE_DEFS[0]["fixed_max"]},
+            {"name": "VIS2", "enabled": True, "min": BASE_ZONE_DEFS[1]["fixed_min"], "max": BASE_ZONE_DEFS[1]["fixed_max"]},
+            {"name": "IR1",  "enabled": True, "min": BASE_ZONE_DEFS[2]["fixed_min"], "max": BASE_ZONE_DEFS[2]["fixed_max"]},
+            {"name": "IR2",  "enabled": True, "min": BASE_ZONE_DEFS[3]["fixed_min"], "max": BASE_ZONE_DEFS[3]["fixed_max"]},
+        ]
+    if not isinstance(zones_cfg, list) or len(zones_cfg) != 4:
+        zones_cfg = default_zone_list()
+    else:
+        for i, z in enumerate(zones_cfg):
+            if "name" not in z: z["name"] = f"Zone{i+1}"
+            if "enabled" not in z: z["enabled"] = True
+            base = BASE_ZONE_DEFS[i]
+            try:
+                zmin = float(z.get("min", base["fixed_min"]))
+                zmax = float(z.get("max", base["fixed_max"]))
+            except:
+                zmin, zmax = base["fixed_min"], base["fixed_max"]
+            if zmin >= zmax:
+                zmin, zmax = base["fixed_min"], base["fixed_max"]
+            z["min"] = zmin
+            z["max"] = zmax
+
+    # Cronus apps launcher config
+    cronus_apps = data.get("cronus_apps")
+    if not isinstance(cronus_apps, list):
+        cronus_apps = []
+    # Each entry should be dict {name, path}
+    cleaned_apps = []
+    for app in cronus_apps:
+        if isinstance(app, dict) and "path" in app:
+            nm = app.get("name") or os.path.basename(app["path"])
+            cleaned_apps.append({"name": nm, "path": app["path"]})
+    cronus_apps = cleaned_apps
+    cronus_default = data.get("cronus_app_default", 0)
+    if not (0 <= cronus_default < len(cronus_apps)):
+        cronus_default = 0 if cronus_apps else -1
+
+    # Fleet devices: each {name, api, channels, enabled, ch1/ch2 param overrides}
+    devices = []
+    seen = set()
+    for i, dev in enumerate(data.get("devices") or []):
+        if not (isinstance(dev, dict) and dev.get("api")):
+            continue
+        name = re.sub(r"[^\w.-]", "_", str(dev.get("name") or f"device{i+1}"))
+        while name in seen:
+            name += "_"
+        seen.add(name)
+        channels = [c for c in dev.get("channels", [1, 2]) if c in (1, 2)]
+        devices.append({
+            "name": name,
+            "api": str(dev["api"]).rstrip("/"),
+            "channels": channels or [1, 2],
+            "enabled": bool(dev.get("enabled", True)),
+            "ch1": dict(dev.get("ch1") or {}),
+            "ch2": dict(dev.get("ch2") or {}),
+        })
+
+    return {
+        "log_dir": LOG_BASE,
+        "ch1": merge_channel(data.get("ch1", {})),
+        "ch2": merge_channel(data.get("ch2", {})),
+        "show_zones": data.get("show_zones", False),
+        "zones": zones_cfg,
+        "cronus_apps": cronus_apps,
+        "cronus_app_default": cronus_default,
+        "http": http_cfg,
+        "devices": devices
+    }
+
+def save_config(cfg, path=None):
+    try:
+        with open(path or CONFIG_PATH, "w", encoding="utf-8") as f:
+            json.dump(cfg, f, indent=2)
+    except Exception as e:
+        print(f"Failed to save config: {e}")
+
+class ResultStore:
+    """Columnar per-run attempt log: float32 wavelength, float64 monotonic time, float32 duration, uint8 status.
+
+    About 17 bytes per attempt. Appended from the engine thread and read
+    from the GUI thread; array appends are atomic under the GIL and
+    readers only look at indices below a len() they took first.
+    """
+    FAILED, SUCCESS = 0, 1
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.wavelength = array("f")
+        self.t = array("d")
+        self.duration = array("f")
+        self.status = array("B")
+        self.success_count = 0
+        self.success_time = 0.0
+        self.total_duration = 0.0
+        self._wall0 = time.time()
+        self._mono0 = time.monotonic()
+
+    def append(self, wavelength, success, duration, t=None):
+        self.t.append(time.monotonic() if t is None else t)
+        self.wavelength.append(wavelength)
+        self.duration.append(duration)
+        self.status.append(self.SUCCESS if success else self.FAILED)
+        self.total_duration += duration
+        if success:
+            self.success_count += 1
+            self.success_time += duration
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def fail_count(self):
+        return len(self) - self.success_count
+
+    @property
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.wavelength, self.t, self.duration, self.status))
+
+    def monotonic_from_wall(self, wall):
+        """Map a time.time() value onto this store's monotonic axis (used when replaying a journal)."""
+        return self._mono0 + wall - self._wall0
+
+    def datetime_at(self, i):
+        return datetime.fromtimestamp(self._wall0 + self.t[i] - self._mono0)
+
+    def rows(self, success=None):
+        """Yield (datetime, wavelength, success, duration), optionally only one status."""
+        for i in range(len(self)):
+            ok = self.status[i] == self.SUCCESS
+            if success is None or ok == success:
+                yield self.datetime_at(i), self.wavelength[i], ok, self.duration[i]
+
+    def recent_wavelengths(self, success, limit):
+        """Newest-first wavelengths with the given status, at most limit of them."""
+        want = self.SUCCESS if success else self.FAILED
+        out = []
+        for i in range(len(self) - 1, -1, -1):
+            if self.status[i] == want:
+                out.append(self.wavelength[i])
+                if len(out) >= limit:
+                    break
+        return out
+
+class LogWriter:
+    """Background thread that owns the run's log files, so the engine never blocks on disk I/O.
+
+    Callers queue text and return at once. Files stay open between writes;
+    everything queued since the last wake-up is written as one batch, and
+    dirty files are flushed every FLUSH_INTERVAL seconds and when closed
+    (fsynced too if opened with fsync=True). Matters when LOG_BASE is a
+    network share.
+    """
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._files = {}
+        self._dirty = set()
+        self._fsync = set()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cronus-log-writer", daemon=True)
+                self._thread.start()
+
+    def open(self, path, mode="a", fsync=False):
+        self._ensure_thread()
+        self._queue.put(("open", path, (mode, fsync)))
+
+    def write(self, path, text):
+        self._queue.put(("write", path, text))
+
+    def close(self, path):
+        self._queue.put(("close", path, None))
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk; False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", None, done))
+        return done.wait(timeout)
+
+    def shutdown(self, timeout=5.0):
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(("stop", None, None))
+        thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+    def _run(self):
+        next_flush = time.monotonic() + self.FLUSH_INTERVAL
+        while True:
+            try:
+                batch = [self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            pending = {}
+            for op, path, arg in batch:
+                if op == "write":
+                    pending.setdefault(path, []).append(arg)
+                    continue
+                self._write_pending(pending)
+                if op == "open":
+                    self._open(path, *arg)
+                elif op == "close":
+                    self._close(path)
+                elif op == "flush":
+                    self._flush_all()
+                    arg.set()
+                elif op == "stop":
+                    stop = True
+            self._write_pending(pending)
+            if stop:
+                for path in list(self._files):
+                    self._close(path)
+                return
+            if time.monotonic() >= next_flush:
+                self._flush_all()
+                next_flush = time.monotonic() + self.FLUSH_INTERVAL
+
+    def _open(self, path, mode, fsync):
+        if path in self._files:
+            return
+        try:
+            self._files[path] = open(path, mode, encoding="utf-8")
+        except OSError as e:
+            print(f"Failed to open log {path}: {e}")
+            return
+        if fsync:
+            self._fsync.add(path)
+
+    def _write_pending(self, pending):
+        for path, chunks in pending.items():
+            f = self._files.get(path)
+            if f is None:
+                continue
+            try:
+                f.writelines(chunks)
+                self._dirty.add(path)
+            except OSError as e:
+                print(f"Failed to write log {path}: {e}")
+        pending.clear()
+
+    def _flush(self, path):
+        f = self._files[path]
+        try:
+            f.flush()
+            if path in self._fsync:
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Failed to flush log {path}: {e}")
+        self._dirty.discard(path)
+
+    def _flush_all(self):
+        for path in list(self._dirty):
+            self._flush(path)
+
+    def _close(self, path):
+        if path not in self._files:
+            return
+        self._flush(path)
+        try:
+            self._files.pop(path).close()
+        except OSError:
+            pass
+        self._fsync.discard(path)
+
+LOG_WRITER = LogWriter()
+atexit.register(LOG_WRITER.shutdown)
+
+class RunJournal:
+    """Append-only JSON-lines record of one channel run, for crash recovery.
+
+    Records are queued on the LogWriter thread, which writes them in
+    batches and fsyncs the file every LogWriter.FLUSH_INTERVAL seconds
+    and on close, so a crash loses at most that window.
+    """
+    def __init__(self, path, writer=None):
+        self.path = path
+        self.writer = writer or LOG_WRITER
+        self.writer.open(path, fsync=True)
+
+    def write(self, kind, **fields):
+        fields["type"] = kind
+        fields["ts"] = round(time.time(), 3)
+        self.writer.write(self.path, json.dumps(fields, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.writer.close(self.path)
+
+class JournalState:
+    """What load_journal recovered from a run journal."""
+    def __init__(self, path):
+        self.path = path
+        self.channel = None
+        self.params = dict(DEFAULT_PARAMS)
+        self.device_range = (None, None)
+        self.started = None
+        self.results = ResultStore()
+        self.power_curve_data = []
+        self.power_started = False
+        self.last_power_wavelength = None
+        self.retest_regions = []
+        self.end_reason = None
+
+    @property
+    def finished(self):
+        return self.end_reason is not None
+
+def load_journal(path):
+    """Replay a run journal into a JournalState; a torn final line from a crash is ignored."""
+    state = JournalState(path)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            kind = rec.get("type")
+            if kind == "attempt":
+                state.results.append(rec["wavelength"], rec["success"], rec["duration"],
+                                     t=state.results.monotonic_from_wall(rec["ts"]))
+            elif kind == "power":
+                state.last_power_wavelength = rec["wavelength"]
+                if rec.get("power") is not None:
+                    state.power_curve_data.append({"wavelength": rec["wavelength"], "power": rec["power"]})
+            elif kind == "retest":
+                state.retest_regions.append({k: v for k, v in rec.items() if k not in ("type", "ts")})
+            elif kind == "state" and rec.get("state") == "power_curve":
+                state.power_started = True
+            elif kind == "start":
+                state.channel = rec["channel"]
+                state.params.update(rec["params"])
+                state.device_range = tuple(rec["device_range"])
+                state.started = datetime.fromtimestamp(rec["ts"])
+            elif kind == "end":
+                state.end_reason = rec.get("reason", "completed")
+            elif kind == "resume":
+                state.end_reason = None
+    return state
+
+def find_resumable_journal(channel, log_dir=None):
+    """Newest Ch<channel> journal in the log directory if that run never finished, else None."""
+    paths = sorted(glob.glob(os.path.join(log_dir or LOG_BASE, f"Ch{channel}_journal_*.jsonl")))
+    if not paths:
+        return None
+    try:
+        state = load_journal(paths[-1])
+    except OSError:
+        return None
+    if state.finished or state.channel != channel:
+        return None
+    return state
+
+def discard_journal(state):
+    """Mark an unfinished journal as abandoned so it is not offered for resume again."""
+    journal = RunJournal(state.path)
+    journal.write("end", reason="discarded")
+    journal.close()
+    journal.writer.flush()
+
+def merge_failure_regions(wavelengths, gap):
+    """Group failed wavelengths (on the 0.1 nm grid) into regions; failures within `gap` nm share one."""
+    regions = []
+    for wl in sorted({round(w, 1) for w in wavelengths}):
+        if regions and wl - regions[-1]["hi"] <= gap + 1e-9:
+            regions[-1]["hi"] = wl
+            regions[-1]["failed"].append(wl)
+        else:
+            regions.append({"lo": wl, "hi": wl, "failed": [wl]})
+    return regions
+
+def write_results_csv(filename, results):
+    with open(filename, "w", newline='', encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Timestamp", "Wavelength (nm)", "Success", "Duration (s)"])
+        for ts, wl, ok, duration in results.rows():
+            w.writerow([
+                ts.strftime("%Y-%m-%d %H:%M:%S"),
+                f"{wl:.1f}",
+                "Yes" if ok else "No",
+                f"{duration:.2f}"
+            ])
+
+class SettleTimeModel:
+    """Learns how long tuning takes to settle, per channel and wavelength-jump bucket.
+
+    Times are measured from the wavelength PUT. Each bucket keeps a sliding
+    window of recent samples so the model follows drift over long runs.
+    """
+    BUCKET_NM = 25.0
+    WINDOW = 64
+    MIN_SAMPLES = 4
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, channel, jump):
+        if jump is None:
+            return [(channel, None)]
+        return [(channel, int(abs(jump) // self.BUCKET_NM)), (channel, None)]
+
+    def record(self, channel, jump, seconds):
+        with self._lock:
+            for key in self._keys(channel, jump):
+                self._samples.setdefault(key, deque(maxlen=self.WINDOW)).append(seconds)
+
+    def window(self, channel, jump, low=0.1, high=0.9):
+        """Return the (low, high) settle-time quantiles, or None until enough samples exist."""
+        with self._lock:
+            for key in self._keys(channel, jump):
+                samples = self._samples.get(key)
+                if samples and len(samples) >= self.MIN_SAMPLES:
+                    ordered = sorted(samples)
+                    return _quantile(ordered, low), _quantile(ordered, high)
+        return None
+
+def _quantile(ordered, q):
+    pos = (len(ordered) - 1) * q
+    lo = int(pos); hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+SETTLE_MODEL = SettleTimeModel()
+
+class RunningStats:
+    """Running mean and variance in O(1) per sample.
+
+    Exact (Welford) for the first `span` samples, then exponentially weighted
+    with the same effective window, so the stats follow drift such as ready
+    dwell shortening while the settle model learns.
+    """
+    __slots__ = ("n", "mean", "m2", "ew_var", "span")
+
+    def __init__(self, span=64):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ew_var = 0.0
+        self.span = span
+
+    def add(self, x):
+        self.n += 1
+        d = x - self.mean
+        if self.n <= self.span:
+            self.mean += d / self.n
+            self.m2 += d * (x - self.mean)
+            self.ew_var = self.m2 / (self.n - 1) if self.n > 1 else 0.0
+        else:
+            a = 2 / (self.span + 1)
+            self.mean += a * d
+            self.ew_var = (1 - a) * (self.ew_var + a * d * d)
+
+    @property
+    def variance(self):
+        return self.ew_var
+
+    @property
+    def effective_n(self):
+        return min(self.n, self.span)
+
+class DurationModel:
+    """Learns full cycle time (set, settle and dwell) per channel and jump bucket, for ETAs.
+
+    Each bucket and each channel as a whole keeps running stats, so an update
+    costs the same at attempt 10 and attempt 10000. Unplanned attempts are
+    costed at the channel-wide stats, which already reflect the sequence's
+    own jump distribution.
+    """
+    BUCKET_NM = SettleTimeModel.BUCKET_NM
+    WINDOW = SettleTimeModel.WINDOW
+    MIN_SAMPLES = 4
+    Z = 1.96
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, channel, jump, seconds):
+        bucket = int(abs(jump) // self.BUCKET_NM) if jump is not None else None
+        with self._lock:
+            self._stats.setdefault((channel, None), RunningStats(self.WINDOW)).add(seconds)
+            if bucket is not None:
+                self._stats.setdefault((channel, bucket), RunningStats(self.WINDOW)).add(seconds)
+
+    def eta(self, channel, remaining, planned_jumps=()):
+        """(expected, low, high) seconds for `remaining` more cycles, or None without enough data.
+
+        The interval covers both cycle-to-cycle spread and the uncertainty of
+        each mean, so it is wide early in a run and narrows as samples build.
+        """
+        with self._lock:
+            overall = self._stats.get((channel, None))
+            if overall is None or overall.n < self.MIN_SAMPLES:
+                return None
+            total = var = 0.0
+            planned = 0
+            for jump in planned_jumps:
+                if planned >= remaining:
+                    break
+                st = self._stats.get((channel, int(abs(jump) // self.BUCKET_NM)))
+                if st is None or st.n < self.MIN_SAMPLES:
+                    st = overall
+                total += st.mean
+                var += st.variance * (1 + 1 / st.effective_n)
+                planned += 1
+            rest = remaining - planned
+            total += rest * overall.mean
+            var += rest * overall.variance + rest * rest * overall.variance / overall.effective_n
+        spread = self.Z * math.sqrt(var)
+        return total, max(0.0, total - spread), total + spread
+
+DURATION_MODEL = DurationModel()
+
+class SettlePollPlan:
+    """Poll delays for the settle phase: sleep until just before the expected
+    completion, poll densely through the learned window, then back off.
+
+    Without a window (model warm-up) it polls every DENSE_MAX for the first
+    WARMUP_DENSE_S, so the first recorded settle times are not rounded up to
+    the coarse interval and the learned window starts unbiased.
+    """
+    COARSE_INTERVAL = 1.0
+    DENSE_MIN = 0.05
+    DENSE_MAX = 0.1
+    WARMUP_DENSE_S = 10.0
+    LEAD = 0.9
+
+    def __init__(self, window):
+        self.window = window
+        if window is not None:
+            early, late = window
+            self.dense = min(max((late - early) / 10.0, self.DENSE_MIN), self.DENSE_MAX)
+            self._backoff = self.dense
+
+    def first_delay(self, elapsed):
+        if self.window is None:
+            return 0.0
+        return max(0.0, self.window[0] * self.LEAD - elapsed)
+
+    def next_delay(self, elapsed):
+        if self.window is None:
+            return self.DENSE_MAX if elapsed < self.WARMUP_DENSE_S else self.COARSE_INTERVAL
+        if elapsed <= self.window[1] * 1.1 + self.dense:
+            return self.dense
+        self._backoff = min(self._backoff * 2, self.COARSE_INTERVAL)
+        return self._backoff
+
+class CoverageMap:
+    """Bitmap over the 0.1 nm grid of a test range: which wavelengths have been tested at least once."""
+    def __init__(self, lo, hi):
+        self.lo_t = math.ceil(round(lo * 10, 6))
+        self.size = max(1, math.floor(round(hi * 10, 6)) - self.lo_t + 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.covered = 0
+
+    def index(self, wl):
+        return min(max(int(round(wl * 10)) - self.lo_t, 0), self.size - 1)
+
+    def wavelength(self, i):
+        return (self.lo_t + i) / 10
+
+    def is_set(self, i):
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+    def mark(self, wl):
+        """Record a tested wavelength; True if it was not covered before."""
+        i = self.index(wl)
+        if self.is_set(i):
+            return False
+        self.bits[i >> 3] |= 1 << (i & 7)
+        self.covered += 1
+        return True
+
+    @property
+    def fraction(self):
+        return self.covered / self.size
+
+    def bins(self, count):
+        """Covered fraction of each of ``count`` equal slices of the range, for display."""
+        out = []
+        for b in range(count):
+            start, end = b * self.size // count, (b + 1) * self.size // count
+            out.append(sum(self.is_set(i) for i in range(start, end)) / max(1, end - start))
+        return out
+
+class WavelengthSequence:
+    """Picks test wavelengths on the 0.1 nm grid of [lo, hi] and tracks coverage.
+
+    The base class is the original independent uniform draw ("random");
+    subclasses override _pick to spread picks out. Callers mark tested
+    wavelengths with ``coverage.mark``; grid indices in ``reserved`` are
+    picked but not yet tested (see JumpScheduler) and are not refilled.
+    """
+    def __init__(self, lo, hi, zones=None, rng=None):
+        self.coverage = CoverageMap(lo, hi)
+        self.rng = rng or random.Random()
+        self.reserved = set()
+
+    def _pick(self):
+        return self.rng.randrange(self.coverage.size)
+
+    def next(self):
+        return self.coverage.wavelength(self._pick())
+
+    def _shuffled(self, start, end):
+        """Uncovered, unreserved grid indices in [start, end), shuffled; all unreserved ones once every one
+        is covered."""
+        free = [i for i in range(start, end) if i not in self.reserved] or list(range(start, end))
+        pool = [i for i in free if not self.coverage.is_set(i)] or free
+        self.rng.shuffle(pool)
+        return pool
+
+def _radical_inverse(k, base=2):
+    inv, denom = 0.0, 1.0
+    while k:
+        k, digit = divmod(k, base)
+        denom *= base
+        inv += digit / denom
+    return inv
+
+class HaltonSequence(WavelengthSequence):
+    """Van der Corput (1-D Halton) points with a random rotation: every prefix is spread evenly."""
+    def __init__(self, lo, hi, zones=None, rng=None):
+        super().__init__(lo, hi, zones, rng)
+        self._k = 0
+        self._shift = self.rng.random()
+
+    def _pick(self):
+        self._k += 1
+        u = (_radical_inverse(self._k) + self._shift) % 1.0
+        return min(int(u * self.coverage.size), self.coverage.size - 1)
+
+class ShuffledGridSequence(WavelengthSequence):
+    """Every grid point once in random order before any repeats."""
+    def __init__(self, lo, hi, zones=None, rng=None):
+        super().__init__(lo, hi, zones, rng)
+        self._pool = []
+
+    def _pick(self):
+        if not self._pool:
+            self._pool = self._shuffled(0, self.coverage.size)
+        return self._pool.pop()
+
+class StratifiedSequence(WavelengthSequence):
+    """Splits the range at zone edges and keeps every stratum's share of picks proportional to its width.
+
+    Within a stratum points are drawn without replacement, so each zone
+    fills in evenly instead of the widest one dominating early.
+    """
+    def __init__(self, lo, hi, zones=None, rng=None):
+        super().__init__(lo, hi, zones, rng)
+        cov = self.coverage
+        edges = {0, cov.size}
+        for zmin, zmax in zones or ():
+            for e in (zmin, zmax):
+                t = math.ceil(round(e * 10, 6)) - cov.lo_t
+                if 0 < t < cov.size:
+                    edges.add(t)
+        edges = sorted(edges)
+        self.strata = list(zip(edges, edges[1:]))
+        self._pools = [[] for _ in self.strata]
+        self._picks = None
+
+    def _pick(self):
+        if self._picks is None:
+            self._picks = [sum(self.coverage.is_set(i) for i in range(a, b)) for a, b in self.strata]
+        s = min(range(len(self.strata)), key=lambda j: self._picks[j] / (self.strata[j][1] - self.strata[j][0]))
+        if not self._pools[s]:
+            self._pools[s] = self._shuffled(*self.strata[s])
+        self._picks[s] += 1
+        return self._pools[s].pop()
+
+_SEQUENCES = {"random": WavelengthSequence, "halton": HaltonSequence,
+              "stratified": StratifiedSequence, "shuffled": ShuffledGridSequence}
+
+def make_sequence(strategy, lo, hi, zones=None, rng=None):
+    return _SEQUENCES.get(strategy, WavelengthSequence)(lo, hi, zones, rng)
+
+class QualificationTest:
+    """Wald sequential probability ratio test on the running pass/fail counts.
+
+    A channel passes once its success rate is shown to be at least
+    spec + margin and fails once it is shown to be at most spec - margin,
+    each at the given confidence (alpha = beta = 1 - confidence). Rates
+    inside the margin can keep a run going until `cycles`, as a fixed-length
+    run would.
+    """
+    def __init__(self, spec_rate, margin, confidence):
+        self.p_good = min(spec_rate + margin, 99.99) / 100
+        self.p_bad = min(max(spec_rate - margin, 0.01), self.p_good * 100 - 0.01) / 100
+        alpha = beta = 1 - confidence / 100
+        # At 50 % (or below) log((1 - beta) / alpha) <= 0: the bounds collapse and one attempt decides
+        if not 0 < alpha < 0.5:
+            raise ValueError(f"qualification confidence must be strictly between 50 and 100 %, got {confidence}")
+        self.fail_bound = math.log((1 - beta) / alpha)
+        self.pass_bound = math.log(beta / (1 - alpha))
+        self._ok_step = math.log(self.p_bad / self.p_good)
+        self._fail_step = math.log((1 - self.p_bad) / (1 - self.p_good))
+        self.llr = 0.0
+        self.attempts = 0
+        self.decision = None
+
+    def update(self, success):
+        """Add one attempt; returns "pass", "fail" or None while undecided."""
+        if self.decision:
+            return self.decision
+        self.attempts += 1
+        self.llr += self._ok_step if success else self._fail_step
+        if self.llr >= self.fail_bound:
+            self.decision = "fail"
+        elif self.llr <= self.pass_bound:
+            self.decision = "pass"
+        return self.decision
+
+class JumpScheduler:
+    """Reorders batches of sequence picks to follow a jump-size profile.
+
+    "min_travel" sweeps each batch in one direction, starting from the
+    nearer end. "max_jump" always goes to the farthest remaining point, for
+    stress. "target" picks the point whose jump is closest to target_jump
+    nm. Coverage is unchanged, because the scheduler only reorders what the
+    sequence hands out; planned picks stay reserved in the sequence until
+    handed out, so a pool refill mid-batch cannot draw them again.
+    """
+    BATCH = 64
+
+    def __init__(self, sequence, profile, target_jump=50.0, batch=None):
+        self.sequence = sequence
+        self.profile = profile
+        self.target_jump = target_jump
+        self.batch = batch or self.BATCH
+        self.planned = deque()
+
+    def next(self, position, remaining=None):
+        if not self.planned:
+            self._plan(position, self.batch if remaining is None else max(1, min(self.batch, remaining)))
+        wl = self.planned.popleft()
+        self.sequence.reserved.discard(self.sequence.coverage.index(wl))
+        return wl
+
+    def _plan(self, position, count):
+        picks = []
+        for _ in range(count):
+            wl = self.sequence.next()
+            self.sequence.reserved.add(self.sequence.coverage.index(wl))
+            picks.append(wl)
+        if position is None:
+            position = picks[0]
+        if self.profile == "min_travel":
+            picks.sort()
+            if abs(position - picks[-1]) < abs(position - picks[0]):
+                picks.reverse()
+            self.planned.extend(picks)
+            return
+        while picks:
+            if self.profile == "max_jump":
+                i = max(range(len(picks)), key=lambda j: abs(picks[j] - position))
+            else:
+                i = min(range(len(picks)), key=lambda j: abs(abs(picks[j] - position) - self.target_jump))
+            position = picks.pop(i)
+            self.planned.append(position)
+
+class ChannelRun:
+    """One channel's wavelength test, run as a coroutine on the shared engine loop.
+
+    Events are reported through ``emit(name, *args)``; the names match the
+    TestWorker signals so the Qt bridge can forward them unchanged.
+    """
+    SETTLE_TIMEOUT = 120.0
+    FIXED_DWELL_MARGIN = 3.0
+    READY_POLL_INTERVAL = 0.2
+    CONNECTION_MAX_AGE = 10.0
+    STATUS_RETRY_MIN = 0.05
+    POWER_RECONNECT_TIMEOUT = 2.0
+    POWER_STABLE_SAMPLES = 3
+    POWER_STABLE_TOLERANCE = 0.02
+    SYSTEMATIC_FAIL_RATE = 0.5
+
+    def __init__(self, channel: int, params: dict, device_range: tuple, emit=None, api=None, settle_model=None,
+                 resume=None, log_dir=None, zones=None, duration_model=None, status_cache=None,
+                 reconnect_timeout=None):
+        self.channel = channel
+        self.params = dict(params)
+        self.emit = emit or (lambda *args: None)
+        self.api = api or TRANSPORT
+        self.status_cache = status_cache or self.api.status_cache
+        self.link = self.status_cache.link
+        # None waits for the device indefinitely (the GUI, where an operator can stop the run); headless
+        # runners pass a limit and the run ends as "unreachable" once the device stays away that long
+        self.reconnect_timeout = reconnect_timeout
+        self.end_reason = None
+        self.executor = None
+        self._in_flight = set()
+        self.settle_model = settle_model or SETTLE_MODEL
+        self.duration_model = duration_model or DURATION_MODEL
+        self.running = False
+        self.last_wavelength = None
+        self.wait_time = params["wait_time"]
+        self.range_min = params["test_min"]
+        self.range_max = params["test_max"]
+        self.cycles = None if (params["cycles"] is None or params["cycles"] <= 0) else params["cycles"]
+        self.measure_power_curve = params["measure_power_curve"]
+        self.dwell_mode = params.get("dwell_mode", DEFAULT_PARAMS["dwell_mode"])
+        self.power_stability = params.get("power_stability", DEFAULT_PARAMS["power_stability"])
+        self.log_dir = log_dir
+        self.fail_log_file = None
+        self.journal = None
+        self.resume = resume
+        self.results = resume.results if resume else ResultStore()
+        self.power_curve_data = resume.power_curve_data if resume else []
+        self.retest = params.get("retest", DEFAULT_PARAMS["retest"])
+        self.retest_regions = list(resume.retest_regions) if resume else []
+        self.device_min, self.device_max = device_range
+
+        if self.device_min is None or self.device_max is None:
+            self.range_min = None
+            self.range_max = None
+        else:
+            if self.range_min is None or self.range_max is None:
+                self.range_min, self.range_max = self.device_min, self.device_max
+            self.range_min = max(self.range_min, self.device_min)
+            self.range_max = min(self.range_max, self.device_max)
+            if self.range_min >= self.range_max:
+                self.range_min, self.range_max = self.device_min, self.device_max
+
+        self.sequence = None
+        if self.range_min is not None:
+            if zones is None:
+                zones = [(z["fixed_min"], z["fixed_max"]) for z in BASE_ZONE_DEFS]
+            self.sequence = make_sequence(params.get("sequence", DEFAULT_PARAMS["sequence"]),
+                                          self.range_min, self.range_max, zones)
+            for wl in self.results.wavelength:
+                self.sequence.coverage.mark(wl)
+        profile = params.get("jump_profile", DEFAULT_PARAMS["jump_profile"])
+        self.qualification = None
+        if params.get("qualification"):
+            self.qualification = QualificationTest(params.get("spec_rate", DEFAULT_PARAMS["spec_rate"]),
+                                                   params.get("qual_margin", DEFAULT_PARAMS["qual_margin"]),
+                                                   params.get("qual_confidence", DEFAULT_PARAMS["qual_confidence"]))
+            for status in self.results.status:
+                self.qualification.update(status == ResultStore.SUCCESS)
+        self.scheduler = None
+        if self.sequence and profile in JUMP_PROFILES and profile != "none":
+            self.scheduler = JumpScheduler(self.sequence, profile,
+                                           params.get("target_jump", DEFAULT_PARAMS["target_jump"]))
+
+    def configure_logs(self):
+        ensure_log_dirs()
+        log_dir = self.log_dir or LOG_BASE
+        os.makedirs(log_dir, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.fail_log_file = os.path.join(log_dir, f"Ch{self.channel}_wavelength_failures_{ts}.txt")
+        LOG_WRITER.open(self.fail_log_file, "w")
+        LOG_WRITER.write(self.fail_log_file, f"Cronus Ch{self.channel} Wavelength Failures Log\n"
+                                             f"Test started: {datetime.now():%Y-%m-%d %H:%M:%S}\n"
+                                             + "-" * 50 + "\n")
+        if self.resume:
+            self.journal = RunJournal(self.resume.path)
+            self.journal.write("resume", attempts=len(self.results))
+        else:
+            self.journal = RunJournal(os.path.join(log_dir, f"Ch{self.channel}_journal_{ts}.jsonl"))
+            self.journal.write("start", channel=self.channel, params=self.params,
+                               device_range=[self.device_min, self.device_max])
+
+    def _set_link(self, ok):
+        """Journal and emit link_state once per lost/restored transition, however often it is observed."""
+        if ok != self._link_ok:
+            self._link_ok = ok
+            self.journal.write("state", state="connection_restored" if ok else "connection_lost")
+            self.emit("link_state", ok)
+
+    async def _call(self, fn, *args):
+        """Run a blocking device call on the engine's executor. Cancelling the caller does not stop a
+        request already on the wire, so calls are tracked until they land; see _quiesce()."""
+        if self.executor is None:
+            return await asyncio.to_thread(fn, *args)
+        cf = self.executor.submit(fn, *args)
+        self._in_flight.add(cf)
+        cf.add_done_callback(self._in_flight.discard)
+        return await asyncio.wrap_future(cf)
+
+    async def _quiesce(self):
+        pending = [cf for cf in list(self._in_flight) if not cf.done()]
+        if pending:
+            await asyncio.wait([asyncio.wrap_future(cf) for cf in pending])
+
+    async def _get(self, path):
+        return await self._call(self.api.get_json, path)
+
+    async def _put(self, path, payload):
+        return await self._call(self.api.put_json, path, payload)
+
+    async def _status_retry(self, delay):
+        """Pause after a status read that got no answer. While the device is unreachable the link
+        monitor cuts the wait short the moment it answers again; a failure on a reachable device
+        (this channel's endpoint erroring) gets the full `delay`, so the poll never spins."""
+        self._set_link(self.link.online)
+        if self.link.online:
+            await asyncio.sleep(delay)
+        else:
+            await self.link.wait_online(delay)
+            await asyncio.sleep(self.STATUS_RETRY_MIN)
+
+    async def _status(self, max_age=0.0):
+        return await self._call(self.status_cache.get, f"/Ch{self.channel}/Status", max_age)
+
+    async def _check_connection(self, max_age=None):
+        # Any status read within CONNECTION_MAX_AGE (the settle or ready polls of the last attempt) counts
+        st = await self._status(self.CONNECTION_MAX_AGE if max_age is None else max_age)
+        return st is not None and st.get("OK", False)
+
+    async def _ensure_connection(self, timeout=None):
+        """Wait until the channel answers OK. While the device is unreachable this sleeps on the link
+        monitor, which wakes every run the moment it answers; a reachable channel that is not OK is
+        re-read with jittered backoff and is not reported as a lost link. Returns False if `timeout`
+        ran out first."""
+        if await self._check_connection():
+            self._set_link(True)
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        attempt = 0
+        while True:
+            self._set_link(self.link.online)
+            left = None if deadline is None else deadline - time.monotonic()
+            if left is not None and left <= 0:
+                return False
+            if not self.link.online:
+                await self.link.wait_online(left)
+            else:
+                delay = self.link.backoff(attempt)
+                await asyncio.sleep(delay if left is None else min(delay, left))
+                attempt += 1
+            if await self._check_connection(0):
+                self._set_link(True)
+                return True
+
+    async def _wait_for_device(self):
+        if not await self._ensure_connection(self.reconnect_timeout):
+            raise ConnectionError(f"Ch{self.channel}: no answer from the device for {self.reconnect_timeout:.0f} s")
+
+    async def run(self):
+        self.running = True
+        self._link_ok = True
+        end_reason = "completed"
+        try:
+            self.configure_logs()
+            if not self.resume:
+                self.results.clear()
+            attempts = len(self.results)
+            if self.range_min is None or self.range_max is None:
+                return
+            run_started = time.monotonic()
+            resumed = attempts
+            while (self.cycles is None or attempts < self.cycles) and not (
+                    self.qualification and self.qualification.decision):
+                await self._wait_for_device()
+                cycle_start = time.monotonic()
+                if self.scheduler:
+                    wl = self.scheduler.next(self.last_wavelength,
+                                             None if self.cycles is None else self.cycles - attempts)
+                else:
+                    wl = self.sequence.next()
+                wl = min(max(wl, self.device_min), self.device_max)
+                prev_wl = self.last_wavelength
+                self.emit("current_wavelength", wl)
+                success, duration = await self._perform_wavelength_attempt(wl)
+                attempts += 1
+                self.results.append(wl, success, duration)
+                if self.sequence.coverage.mark(wl):
+                    self.emit("coverage_update", self.sequence.coverage.fraction)
+                self.journal.write("attempt", wavelength=wl, success=success, duration=round(duration, 4))
+                self.emit("update_status", success, duration, wl)
+                self.emit("progress_update", attempts, self.cycles or 0)
+                if not success:
+                    LOG_WRITER.write(self.fail_log_file, f"{datetime.now():%Y-%m-%d %H:%M:%S} - Failed wavelength: "
+                                                         f"{wl} nm (Duration: {duration:.1f}s)\n")
+                await self._dwell()
+                self.duration_model.record(self.channel, None if prev_wl is None else wl - prev_wl,
+                                           time.monotonic() - cycle_start)
+                estimate = self.estimate_remaining(attempts)
+                if estimate is not None:
+                    self.emit("run_estimate", *estimate)
+                if self.qualification and self.qualification.update(success):
+                    if self.cycles is None:
+                        saved = 0.0
+                    elif estimate is not None:
+                        saved = estimate[0]
+                    else:
+                        saved = (time.monotonic() - run_started) / (attempts - resumed) * (self.cycles - attempts)
+                    self.journal.write("qualification", decision=self.qualification.decision,
+                                       attempts=attempts, saved_s=round(saved, 1))
+                    self.emit("qualification_decided", self.qualification.decision, attempts, saved)
+            if self.retest:
+                await self._retest_failures()
+            if self.measure_power_curve:
+                await self._measure_power_curve()
+        except asyncio.CancelledError:
+            end_reason = "stopped"
+            raise
+        except ConnectionError as e:
+            end_reason = "unreachable"
+            self.emit("command_sent", str(e))
+        except Exception:
+            end_reason = "error"
+            raise
+        finally:
+            self.running = False
+            # A further cancel (engine shutdown, a repeated stop) must not skip the abort or the journal
+            # end record, or the run would be offered for resume: shield the wind-down and keep waiting
+            wind_down = asyncio.ensure_future(self._wind_down(end_reason))
+            while True:
+                try:
+                    await asyncio.shield(wind_down)
+                    break
+                except asyncio.CancelledError:
+                    if wind_down.done():
+                        raise
+
+    async def _wind_down(self, end_reason):
+        self.end_reason = end_reason
+        # Nothing may touch the device after quiesced: let in-flight requests land, then abort if asked
+        await self._quiesce()
+        if end_reason == "stopped" and self.params.get("abort_on_stop"):
+            path = self.params.get("abort_path", DEFAULT_PARAMS["abort_path"]).format(channel=self.channel)
+            self.emit("command_sent", f"PUT {path}")
+            resp = await self._call(self.api.put_json, path, {"OK": True})
+            if self.journal:
+                self.journal.write("state", state="aborted" if resp and resp.get("OK") else "abort_failed")
+        if self.journal:
+            self.journal.write("end", reason=end_reason)
+            self.journal.close()
+        if self.fail_log_file:
+            LOG_WRITER.close(self.fail_log_file)
+        self.emit("finished")
+        self.emit("quiesced")
+
+    def estimate_remaining(self, attempts):
+        """(expected, low, high) seconds left in a finite run, or None while the duration model is cold."""
+        if self.cycles is None:
+            return None
+        remaining = self.cycles - attempts
+        if remaining <= 0:
+            return 0.0, 0.0, 0.0
+        jumps = []
+        pos = self.last_wavelength
+        for wl in self.scheduler.planned if self.scheduler else ():
+            if pos is not None:
+                jumps.append(wl - pos)
+            pos = wl
+        return self.duration_model.eta(self.channel, remaining, jumps)
+
+    async def _perform_wavelength_attempt(self, wl):
+        start_time = time.monotonic()
+        jump = None if self.last_wavelength is None else wl - self.last_wavelength
+        self.last_wavelength = wl
+        self.emit("command_sent", f"PUT /Ch{self.channel}/Wavelength: {wl} nm")
+        put_resp = await self._put(f"/Ch{self.channel}/Wavelength", {"OK": True, "Wavelength": wl})
+        if put_resp is None:
+            self._set_link(self.link.online)
+            return False, time.monotonic() - start_time
+        active_started = False
+        for _ in range(10):
+            self.emit("command_sent", f"GET /Ch{self.channel}/Status")
+            st = await self._status()
+            if st is None:
+                await self._status_retry(0.5); continue
+            self._set_link(True)
+            if st.get("IsWavelengthSettingActive", False):
+                active_started = True
+                break
+            await asyncio.sleep(0.5)
+        if not active_started:
+            return False, time.monotonic() - start_time
+        success = False
+        plan = SettlePollPlan(self.settle_model.window(self.channel, jump))
+        await asyncio.sleep(plan.first_delay(time.monotonic() - start_time))
+        while time.monotonic() - start_time < self.SETTLE_TIMEOUT:
+            self.emit("command_sent", f"GET /Ch{self.channel}/Status")
+            st = await self._status()
+            if st is None:
+                await self._status_retry(1.0); continue
+            self._set_link(True)
+            if not st.get("IsWavelengthSettingActive", True):
+                if st.get("WavelengthSettingState", "") == "Success":
+                    success = True
+                self.settle_model.record(self.channel, jump, time.monotonic() - start_time)
+                break
+            await asyncio.sleep(plan.next_delay(time.monotonic() - start_time))
+        return success, time.monotonic() - start_time
+
+    async def _dwell(self):
+        """Post-set wait. "fixed" sleeps wait_time plus a margin; "ready" returns as
+        soon as the channel reports settled (and, optionally, power is stable),
+        with wait_time as the upper bound."""
+        if self.dwell_mode != "ready":
+            await asyncio.sleep(self.wait_time + self.FIXED_DWELL_MARGIN)
+            return
+        deadline = time.monotonic() + self.wait_time
+        powers = deque(maxlen=self.POWER_STABLE_SAMPLES)
+        while True:
+            if await self._is_settled(powers): return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: return
+            await asyncio.sleep(min(self.READY_POLL_INTERVAL, remaining))
+
+    async def _is_settled(self, powers):
+        self.emit("command_sent", f"GET /Ch{self.channel}/Status")
+        st = await self._status()
+        if st is None or not st.get("OK", False) or st.get("IsWavelengthSettingActive", True):
+            powers.clear()
+            return False
+        if not self.power_stability:
+            return True
+        self.emit("command_sent", f"GET /Ch{self.channel}/Power")
+        p = await self._get(f"/Ch{self.channel}/Power")
+        if not (p and p.get("OK")):
+            powers.clear()
+            return False
+        powers.append(float(p.get("Power", 0.0)))
+        if len(powers) < powers.maxlen:
+            return False
+        ref = max(abs(sum(powers) / len(powers)), 1e-9)
+        return (max(powers) - min(powers)) / ref <= self.POWER_STABLE_TOLERANCE
+
+    async def _retest_failures(self):
+        """Re-test failure regions and their edges, then classify each region.
+
+        Adjacent failures (within twice the radius) are merged first so a
+        tuning hole costs one region. Each failed wavelength and the two
+        points `retest_radius` nm outside the region are tested
+        `retest_repeats` times. A region whose failed wavelengths fail again
+        at least SYSTEMATIC_FAIL_RATE of the time is "systematic", otherwise
+        "intermittent". Retests go to the journal and the retest_finished
+        event, not into the run's results.
+        """
+        # Same clamps as merge_channel: params may come straight from a caller or an older journal
+        repeats = max(1, int(self.params.get("retest_repeats", DEFAULT_PARAMS["retest_repeats"])))
+        radius = max(0.0, float(self.params.get("retest_radius", DEFAULT_PARAMS["retest_radius"])))
+        regions = merge_failure_regions([wl for _, wl, _, _ in self.results.rows(success=False)], 2 * radius)
+        done = {(r["lo"], r["hi"]) for r in self.retest_regions}
+        todo = [r for r in regions if (r["lo"], r["hi"]) not in done]
+        total = sum((len(r["failed"]) + 2) * repeats for r in todo)
+        count = 0
+        if todo:
+            self.journal.write("state", state="retest")
+        for region in todo:
+            edges = [round(max(region["lo"] - radius, self.range_min), 1),
+                     round(min(region["hi"] + radius, self.range_max), 1)]
+            fails = {"failed": 0, "edges": 0}
+            for _ in range(repeats):
+                for key, points in (("failed", region["failed"]), ("edges", edges)):
+                    for wl in points:
+                        await self._wait_for_device()
+                        self.emit("current_wavelength", wl)
+                        success, _ = await self._perform_wavelength_attempt(wl)
+                        fails[key] += 0 if success else 1
+                        count += 1
+                        self.emit("retest_progress", count, total)
+                        await self._dwell()
+            fail_rate = fails["failed"] / (len(region["failed"]) * repeats)
+            result = {"lo": region["lo"], "hi": region["hi"], "failed": region["failed"],
+                      "repeats": repeats, "fail_rate": round(fail_rate, 3),
+                      "edge_fail_rate": round(fails["edges"] / (2 * repeats), 3),
+                      "classification": "systematic" if fail_rate >= self.SYSTEMATIC_FAIL_RATE else "intermittent"}
+            self.retest_regions.append(result)
+            self.journal.write("retest", **result)
+            if result["classification"] == "systematic":
+                LOG_WRITER.write(self.fail_log_file, f"{datetime.now():%Y-%m-%d %H:%M:%S} - Systematic failure region: "
+                                                     f"{region['lo']}-{region['hi']} nm "
+                                                     f"(retest fail rate {fail_rate:.0%})\n")
+        self.emit("retest_finished", self.retest_regions)
+
+    async def _measure_power_curve(self):
+        if self.range_min is None or self.range_max is None:
+            self.emit("power_curve_finished", [])
+            return
+        resume_after = None
+        if self.resume and self.resume.power_started:
+            resume_after = self.resume.last_power_wavelength
+        else:
+            self.power_curve_data = []
+        self.journal.write("state", state="power_curve")
+        span = self.range_max - self.range_min
+        if span < 10:
+            wls = [int((self.range_min + self.range_max) / 2)]
+        else:
+            wls = list(range(int(self.range_min), int(self.range_max) + 1, 10))
+            if wls[-1] < int(self.range_max):
+                wls.append(int(self.range_max))
+        for wl in wls:
+            if resume_after is not None and wl <= resume_after:
+                continue
+            if not await self._ensure_connection(self.POWER_RECONNECT_TIMEOUT):
+                break
+            wl = min(max(wl, self.device_min), self.device_max)
+            success, _ = await self._perform_wavelength_attempt(wl)
+            power = None
+            if success:
+                await asyncio.sleep(3)
+                self.emit("command_sent", f"GET /Ch{self.channel}/Power")
+                p = await self._get(f"/Ch{self.channel}/Power")
+                if p and p.get("OK"):
+                    power = p.get("Power", 0.0)
+                    self.power_curve_data.append({"wavelength": wl, "power": power})
+            self.journal.write("power", wavelength=wl, power=power)
+        self.emit("power_curve_finished", self.power_curve_data)
+
+class TestEngine:
+    """Drives any number of ChannelRuns as tasks on one asyncio loop in a background thread.
+
+    Blocking HTTP calls are handed to the loop's executor, so a slow device
+    never stalls the other channels, and stopping a run cancels its task
+    instead of waiting out sleeps.
+    """
+    HTTP_WORKERS = 16
+
+    def __init__(self, http_workers=None):
+        self.http_workers = http_workers or self.HTTP_WORKERS
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._cancelling = set()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(self.http_workers, thread_name_prefix="cronus-http")
+                loop.set_default_executor(self._executor)
+                thread = threading.Thread(target=loop.run_forever, name="cronus-engine", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def start(self, run: ChannelRun):
+        """Schedule ``run`` and return an event that is set once it has fully unwound and quiesced."""
+        loop = self._ensure_loop()
+        run.executor = self._executor
+        done = threading.Event()
+        async def _wrapper():
+            try:
+                await run.run()
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._tasks.pop(id(run), None)
+                self._cancelling.discard(id(run))
+                done.set()
+        def _create():
+            self._tasks[id(run)] = loop.create_task(_wrapper())
+        loop.call_soon_threadsafe(_create)
+        return done
+
+    def cancel(self, run: ChannelRun):
+        """Stop ``run``; a no-op once it is already stopping, so its wind-down is not interrupted."""
+        loop = self._loop
+        if loop is None:
+            return
+        def _cancel():
+            task = self._tasks.get(id(run))
+            if task is not None and id(run) not in self._cancelling:
+                self._cancelling.add(id(run))
+                task.cancel()
+        loop.call_soon_threadsafe(_cancel)
+
+    def shutdown(self, timeout=2.0):
+        loop = self._loop
+        if loop is None:
+            return
+        def _cancel_all():
+            for task in list(self._tasks.values()):
+                task.cancel()
+        loop.call_soon_threadsafe(_cancel_all)
+        deadline = time.monotonic() + timeout
+        while self._tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        with self._lock:
+            self._executor.shutdown(wait=False)
+            self._loop = None
+            self._thread = None
+            self._executor = None
+
+ENGINE = TestEngine()
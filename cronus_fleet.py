@@ -0,0 +1,280 @@
+"""Fleet runner: test every Cronus unit in a rack from one station.
+
+Takes the "devices" list from cronus_app_config.json (or --api URLs given
+on the command line) and runs all of their channels concurrently on one
+TestEngine. Each device keeps its own state: a CronusTransport and
+connection pool, a status cache, settle-time and duration models, and
+its logs, journals and CSVs under LOG_BASE/<device name>. A live table
+of per-device and total stats is printed every --interval seconds,
+followed by a summary. Exit codes are the same as cronus_cli.
+
+    "devices": [
+        {"name": "rack1-a", "api": "http://10.0.0.11:35100/v0/Cronus"},
+        {"name": "rack1-b", "api": "http://10.0.0.12:35100/v0/Cronus", "channels": [1],
+         "ch1": {"cycles": 2000}}
+    ]
+
+    python cronus_fleet.py --cycles 500 --dwell-mode ready --interval 10
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import cronus_engine as engine
+from cronus_cli import apply_overrides, channel_verdict, format_eta
+
+EXIT_PASS = 0
+EXIT_FAIL = 1
+EXIT_ERROR = 2
+
+class FleetDevice:
+    """One Cronus unit and the state that must not be shared with its neighbours."""
+    def __init__(self, name, api, channels=(1, 2), overrides=None, http_cfg=None):
+        http_cfg = http_cfg or engine.DEFAULT_HTTP
+        self.name = name
+        self.channels = list(channels)
+        self.overrides = overrides or {}
+        self.transport = engine.CronusTransport(api, pool_size=http_cfg["pool_size"],
+                                                keep_alive=http_cfg["keep_alive"],
+                                                timeouts=http_cfg["timeouts"],
+                                                default_timeout=http_cfg["default_timeout"])
+        self.status_cache = self.transport.status_cache
+        self.settle_model = engine.SettleTimeModel()
+        self.duration_model = engine.DurationModel()
+        self.log_dir = os.path.join(engine.LOG_BASE, name)
+        self.ranges = {}
+
+    def params(self, cfg, channel, args):
+        key = f"ch{channel}"
+        return apply_overrides({**cfg.get(key, {}), **self.overrides.get(key, {})}, args)
+
+class FleetStats:
+    """Live per-(device, channel) counters fed by engine events; safe to read from any thread."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+        self.started = time.monotonic()
+
+    def sink(self, device, channel, cycles):
+        row = {"device": device, "channel": channel, "cycles": cycles or 0, "attempts": 0, "success": 0,
+               "failed": 0, "duration": 0.0, "connection_lost": 0, "coverage": 0.0, "eta_s": None, "eta_high_s": None,
+               "qualification": None, "saved_s": 0.0,
+               "state": "starting"}
+        with self._lock:
+            self._rows[(device, channel)] = row
+        def emit(name, *args):
+            with self._lock:
+                if name == "update_status":
+                    success, duration, _ = args
+                    row["attempts"] += 1
+                    row["success" if success else "failed"] += 1
+                    row["duration"] += duration
+                    row["state"] = "running"
+                elif name == "run_estimate":
+                    row["eta_s"] = round(args[0])
+                    row["eta_high_s"] = round(args[2])
+                elif name == "qualification_decided":
+                    row["qualification"] = args[0]
+                    row["saved_s"] = round(args[2], 1)
+                    row["state"] = f"qualified {args[0]}"
+                elif name == "retest_progress":
+                    row["state"] = f"retest {args[0]}/{args[1]}"
+                elif name == "coverage_update":
+                    row["coverage"] = round(args[0] * 100, 2)
+                elif name == "link_state":
+                    if args[0]:
+                        row["state"] = "running"
+                    else:
+                        row["connection_lost"] += 1
+                        row["state"] = "offline"
+                elif name == "power_curve_finished":
+                    row["state"] = "power curve done"
+                elif name == "finished":
+                    row["state"] = f"qualified {row['qualification']}" if row["qualification"] else "finished"
+                    row["eta_s"] = row["eta_high_s"] = None
+        return emit
+
+    def snapshot(self):
+        hours = max(time.monotonic() - self.started, 1e-6) / 3600
+        with self._lock:
+            rows = [dict(r) for r in self._rows.values()]
+        total = {"device": "TOTAL", "channel": "", "cycles": sum(r["cycles"] for r in rows), "state": "",
+                 "attempts": sum(r["attempts"] for r in rows), "success": sum(r["success"] for r in rows),
+                 "failed": sum(r["failed"] for r in rows), "duration": sum(r["duration"] for r in rows),
+                 "connection_lost": sum(r["connection_lost"] for r in rows),
+                 "saved_s": round(sum(r["saved_s"] for r in rows), 1),
+                 "eta_s": max((r["eta_s"] for r in rows if r["eta_s"] is not None), default=None),
+                 "eta_high_s": max((r["eta_high_s"] for r in rows if r["eta_high_s"] is not None), default=None)}
+        for r in rows + [total]:
+            r["success_rate"] = round(r["success"] / r["attempts"] * 100, 2) if r["attempts"] else 0.0
+            r["attempts_per_hour"] = round(r["attempts"] / hours)
+            r["avg_duration"] = round(r["duration"] / r["attempts"], 3) if r["attempts"] else 0.0
+        return rows, total
+
+def format_table(rows, total):
+    lines = [f"{'device':<16}{'ch':>3}{'attempts':>10}{'ok':>8}{'fail':>6}{'rate':>8}{'cover':>8}{'att/h':>9}{'eta':>9}  state"]
+    for r in sorted(rows, key=lambda r: (r["device"], r["channel"])) + [total]:
+        done = f"{r['attempts']}/{r['cycles']}" if r["cycles"] else str(r["attempts"])
+        cover = f"{r['coverage']:.1f}%" if "coverage" in r else ""
+        eta = format_eta(r["eta_s"]) if r.get("eta_s") is not None else ""
+        lines.append(f"{r['device']:<16}{r['channel']!s:>3}{done:>10}{r['success']:>8}{r['failed']:>6}"
+                     f"{r['success_rate']:>7.1f}%{cover:>8}{r['attempts_per_hour']:>9}{eta:>9}  {r['state']}")
+    return "\n".join(lines)
+
+def build_devices(cfg, args):
+    http_cfg = cfg.get("http")
+    if args.api:
+        devices = [FleetDevice(urlparse(url).netloc.replace(":", "_") or f"device{i+1}", url.rstrip("/"),
+                               args.channels or (1, 2), http_cfg=http_cfg)
+                   for i, url in enumerate(args.api)]
+    else:
+        devices = [FleetDevice(d["name"], d["api"], args.channels or d["channels"],
+                               {"ch1": d["ch1"], "ch2": d["ch2"]}, http_cfg)
+                   for d in cfg.get("devices", []) if d["enabled"]]
+    if args.devices:
+        devices = [d for d in devices if d.name in args.devices]
+    return devices
+
+def fetch_fleet_ranges(devices):
+    """GetRange every device's channels at once; fills FleetDevice.ranges."""
+    def _fetch(dev):
+        dev.ranges = engine.fetch_device_ranges(dev.channels, api=dev.transport)
+    with ThreadPoolExecutor(max_workers=max(1, len(devices))) as pool:
+        list(pool.map(_fetch, devices))
+
+def run(args):
+    cfg = engine.load_config(args.config)
+    if args.log_dir:
+        engine.set_log_dir(args.log_dir)
+    devices = build_devices(cfg, args)
+    if not devices:
+        print("No devices: add a \"devices\" list to the config or pass --api URL ...", file=sys.stderr)
+        return EXIT_ERROR
+    fetch_fleet_ranges(devices)
+    stats = FleetStats()
+    runs = []
+    exit_code = EXIT_PASS
+    for dev in devices:
+        for ch in dev.channels:
+            device_range = dev.ranges.get(ch, (None, None))
+            if device_range[0] is None:
+                print(f"{dev.name} Ch{ch}: device range unavailable at {dev.transport.base_url}", file=sys.stderr)
+                exit_code = EXIT_ERROR
+                continue
+            params = dev.params(cfg, ch, args)
+            run = engine.ChannelRun(ch, params, device_range, emit=stats.sink(dev.name, ch, params["cycles"]),
+                                    api=dev.transport, settle_model=dev.settle_model, log_dir=dev.log_dir,
+                                    zones=engine.zone_bounds(cfg["zones"]), duration_model=dev.duration_model,
+                                    status_cache=dev.status_cache, reconnect_timeout=args.reconnect_timeout or None)
+            runs.append((dev, run))
+    if not runs:
+        return EXIT_ERROR
+    # Every channel holds at most one blocking HTTP call at a time, plus headroom for range reads
+    fleet_engine = engine.TestEngine(http_workers=max(engine.TestEngine.HTTP_WORKERS, len(runs) + 4))
+    stats.started = time.monotonic()
+    done = [fleet_engine.start(run) for _, run in runs]
+    try:
+        while not all(d.is_set() for d in done):
+            deadline = time.monotonic() + args.interval
+            for d in done:
+                d.wait(max(0.0, deadline - time.monotonic()))
+            if not args.quiet and not all(d.is_set() for d in done):
+                _print_stats(stats, args.json)
+    except KeyboardInterrupt:
+        print("Interrupted, stopping...", file=sys.stderr)
+        for _, run in runs:
+            fleet_engine.cancel(run)
+        for d in done:
+            d.wait(5)
+        exit_code = EXIT_FAIL
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary = []
+    for dev, run in runs:
+        results = run.results
+        total = len(results)
+        rate = results.success_count / total * 100 if total else 0.0
+        decision = run.qualification.decision if run.qualification else None
+        passed, verdict = channel_verdict(run, args.min_success_rate)
+        if not passed and exit_code == EXIT_PASS:
+            exit_code = EXIT_FAIL
+        csv_path = os.path.join(dev.log_dir, f"Ch{run.channel}_TestResults_{ts}.csv")
+        engine.write_results_csv(csv_path, results)
+        summary.append({"device": dev.name, "channel": run.channel, "attempts": total,
+                        "success": results.success_count, "failed": results.fail_count,
+                        "success_rate": round(rate, 2), "passed": passed, "verdict": verdict, "qualification": decision,
+                        "retest_regions": run.retest_regions, "results_csv": csv_path})
+    rows, total = stats.snapshot()
+    if args.json:
+        print(json.dumps({"event": "summary", "elapsed_s": round(time.monotonic() - stats.started, 1),
+                          "total": total, "channels": summary}))
+    else:
+        print(format_table(rows, total))
+        for s in summary:
+            print(f"{s['device']} Ch{s['channel']}: {s['success']}/{s['attempts']} ok "
+                  f"({s['success_rate']:.1f}%) -> {s['verdict']}"
+                  f"{' (qualified early)' if s['qualification'] and s['verdict'] in ('PASS', 'FAIL') else ''}")
+            for r in s["retest_regions"]:
+                print(f"    retest {r['lo']:.1f}-{r['hi']:.1f} nm: {r['classification']} "
+                      f"(fails {r['fail_rate']:.0%} of re-tests)")
+        print(f"Elapsed {time.monotonic() - stats.started:.1f} s, {len(devices)} devices, {len(runs)} channels")
+        if total["saved_s"]:
+            print(f"Early qualification saved ~{format_eta(total['saved_s'])} of bench time")
+    fleet_engine.shutdown()
+    engine.LOG_WRITER.shutdown()
+    for dev in devices:
+        dev.transport.close()
+    return exit_code
+
+def _print_stats(stats, as_json):
+    rows, total = stats.snapshot()
+    if as_json:
+        print(json.dumps({"event": "stats", "time": datetime.now().strftime("%H:%M:%S"),
+                          "total": total, "channels": rows}), flush=True)
+    else:
+        print(f"\n[{datetime.now():%H:%M:%S}]\n{format_table(rows, total)}", flush=True)
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Run Cronus wavelength tests on a fleet of devices at once")
+    ap.add_argument("--config", help=f"config file (default: {engine.CONFIG_PATH})")
+    ap.add_argument("--api", nargs="+", metavar="URL", help="device API base URLs (instead of config devices)")
+    ap.add_argument("--devices", nargs="+", metavar="NAME", help="only run these config devices")
+    ap.add_argument("--channels", type=int, nargs="+", choices=(1, 2), help="override channels for every device")
+    ap.add_argument("--log-dir", help="override log_dir from the config")
+    ap.add_argument("--cycles", type=int, help="override cycles (0 = until interrupted)")
+    ap.add_argument("--wait-time", type=float, help="override post-set wait (s)")
+    ap.add_argument("--dwell-mode", choices=engine.DWELL_MODES)
+    ap.add_argument("--sequence", choices=engine.SEQUENCE_STRATEGIES, help="wavelength ordering strategy")
+    ap.add_argument("--jump-profile", choices=engine.JUMP_PROFILES, help="reorder wavelengths by jump size")
+    ap.add_argument("--target-jump", type=float, help="jump size (nm) for --jump-profile target")
+    ap.add_argument("--no-power-curve", action="store_true")
+    ap.add_argument("--min-success-rate", type=float, default=100.0,
+                    help="percent of attempts each channel must pass")
+    ap.add_argument("--qualify", action="store_true",
+                    help="stop each channel as soon as a sequential test settles pass/fail against --spec-rate")
+    ap.add_argument("--spec-rate", type=float, help="qualification spec success rate (%%)")
+    ap.add_argument("--qual-margin", type=float, help="indifference margin around the spec (%% points)")
+    ap.add_argument("--qual-confidence", type=float, help="confidence of the qualification decision (%%)")
+    ap.add_argument("--retest", action="store_true",
+                    help="after the run, re-test failure regions and classify them intermittent or systematic")
+    ap.add_argument("--retest-repeats", type=int, help="re-tests per wavelength in the retest phase")
+    ap.add_argument("--retest-radius", type=float, help="nm around each failure region to probe (and merge within)")
+    ap.add_argument("--abort-on-stop", action="store_true",
+                    help="on Ctrl+C, send each channel's abort_path to stop an in-progress tuning")
+    ap.add_argument("--reconnect-timeout", type=float, default=300.0,
+                    help="end a channel after the device has been unreachable this many seconds (0 = wait forever)")
+    ap.add_argument("--interval", type=float, default=5.0, help="seconds between live stats tables")
+    ap.add_argument("--json", action="store_true", help="print stats and summary as JSON lines")
+    ap.add_argument("--quiet", action="store_true", help="only print the summary")
+    return ap
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
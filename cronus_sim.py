@@ -0,0 +1,358 @@
+"""Local simulator for the Cronus REST API.
+
+Serves the endpoints the training app uses (/Status, /Mode, /Off and
+/Ch{n}/Status, /Wavelength, /WavelengthRange, /Power, /Abort) under /v0/Cronus, with
+configurable tuning-time distributions, failure regions, latency and power
+curves. A time-acceleration factor shrinks every simulated delay so long
+runs finish in seconds.
+
+    python cronus_sim.py --port 35100 --accel 100 --config sim.json
+
+Extra /Sim endpoints are for tooling: GET /Sim/Stats, PUT /Sim/Reset and
+PUT /Sim/Outage {"Seconds": n}.
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+API_PREFIX = "/v0/Cronus"
+
+DEFAULT_SIM_CONFIG = {
+    "channels": {
+        "1": {"min": 680.0, "max": 960.0},
+        "2": {"min": 950.0, "max": 1300.0}
+    },
+    # duration = base_s + per_nm_s * |jump| with jitter; "normal" and "uniform"
+    # add jitter_s seconds, "lognormal" scales by exp(N(0, jitter_s))
+    "tuning": {
+        "distribution": "normal",
+        "base_s": 1.5,
+        "per_nm_s": 0.01,
+        "jitter_s": 0.2,
+        "min_s": 0.2
+    },
+    # First matching region wins; wavelengths outside every region use p_fail_default
+    "failure_regions": [],
+    "p_fail_default": 0.02,
+    "latency_s": {"mean": 0.002, "jitter": 0.001},
+    # Gaussian power curve per channel, with relative noise once settled
+    "power": {
+        "1": {"peak_mw": 120.0, "center_nm": 800.0, "width_nm": 160.0},
+        "2": {"peak_mw": 80.0, "center_nm": 1100.0, "width_nm": 220.0},
+        "noise": 0.005,
+        "tuning_noise": 0.3
+    },
+    "accel": 1.0,
+    # Report the first /Status after a PUT as active even if an accelerated
+    # tuning already finished, so pollers always observe the transition
+    "sticky_active": True
+}
+
+def _merge(base, override):
+    merged = dict(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def load_sim_config(path=None, overrides=None):
+    data = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    return _merge(_merge(DEFAULT_SIM_CONFIG, data), overrides)
+
+class SimChannel:
+    def __init__(self, channel, cfg):
+        self.channel = channel
+        self.min = float(cfg["min"])
+        self.max = float(cfg["max"])
+        self.wavelength = round((self.min + self.max) / 2, 1)
+        self.target = self.wavelength
+        self.active_until = None
+        self.state = "Success"
+        self.pending_state = "Success"
+        self.sticky = False
+
+class CronusSimulator:
+    """Thread-safe device model; all times are simulated seconds (real x accel)."""
+    def __init__(self, config=None, seed=None):
+        self.config = config or load_sim_config()
+        self.accel = max(float(self.config.get("accel", 1.0)), 1e-6)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.mode = "Ready"
+            self.outage_until = None
+            self.channels = {int(ch): SimChannel(int(ch), c) for ch, c in self.config["channels"].items()}
+            self.stats = {"requests": 0, "by_endpoint": {}, "tunings": 0, "failures": 0, "aborts": 0,
+                          "tuning_sim_s": 0.0, "started": time.time()}
+
+    def now(self):
+        return (time.monotonic() - self._t0) * self.accel
+
+    def latency(self):
+        lat = self.config["latency_s"]
+        with self.lock:
+            s = self.rng.gauss(lat.get("mean", 0.0), lat.get("jitter", 0.0))
+        return max(0.0, s) / self.accel
+
+    def count(self, endpoint):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+
+    def is_down(self):
+        with self.lock:
+            return self.outage_until is not None and self.now() < self.outage_until
+
+    def start_outage(self, seconds):
+        with self.lock:
+            self.outage_until = self.now() + float(seconds)
+
+    def _tuning_duration(self, jump):
+        t = self.config["tuning"]
+        nominal = t.get("base_s", 1.0) + t.get("per_nm_s", 0.0) * abs(jump)
+        jitter = t.get("jitter_s", 0.0)
+        dist = t.get("distribution", "normal")
+        if dist == "lognormal":
+            d = nominal * math.exp(self.rng.gauss(0.0, jitter))
+        elif dist == "uniform":
+            d = nominal + self.rng.uniform(-jitter, jitter)
+        else:
+            d = nominal + self.rng.gauss(0.0, jitter)
+        return max(t.get("min_s", 0.0), d)
+
+    def _p_fail(self, wl):
+        for region in self.config.get("failure_regions", []):
+            if region["min"] <= wl <= region["max"]:
+                return float(region.get("p_fail", 0.0))
+        return float(self.config.get("p_fail_default", 0.0))
+
+    def _settle(self, ch):
+        if ch.active_until is not None and self.now() >= ch.active_until:
+            ch.active_until = None
+            ch.state = ch.pending_state
+            if ch.state == "Success":
+                ch.wavelength = ch.target
+
+    def channel_status(self, n):
+        with self.lock:
+            ch = self.channels.get(n)
+            if ch is None or self.mode == "Off":
+                return {"OK": False}
+            self._settle(ch)
+            active = ch.active_until is not None or ch.sticky
+            ch.sticky = False
+            return {
+                "OK": True,
+                "IsWavelengthSettingActive": active,
+                "WavelengthSettingState": "Active" if active else ch.state,
+                "Wavelength": ch.wavelength
+            }
+
+    def set_wavelength(self, n, wl):
+        with self.lock:
+            ch = self.channels.get(n)
+            if ch is None or self.mode == "Off":
+                return {"OK": False}
+            try:
+                wl = float(wl)
+            except (TypeError, ValueError):
+                return {"OK": False, "Error": "Invalid wavelength"}
+            if not (ch.min <= wl <= ch.max):
+                return {"OK": False, "Error": "Wavelength out of range"}
+            self._settle(ch)
+            duration = self._tuning_duration(wl - ch.wavelength)
+            failed = self.rng.random() < self._p_fail(wl)
+            ch.target = wl
+            ch.active_until = self.now() + duration
+            ch.pending_state = "Failed" if failed else "Success"
+            ch.sticky = bool(self.config.get("sticky_active", True))
+            self.stats["tunings"] += 1
+            self.stats["failures"] += int(failed)
+            self.stats["tuning_sim_s"] += duration
+            return {"OK": True, "Wavelength": wl}
+
+    def abort(self, n):
+        """Stop an in-progress tuning where it is; the channel reports "Aborted" until the next set."""
+        with self.lock:
+            ch = self.channels.get(n)
+            if ch is None or self.mode == "Off":
+                return {"OK": False}
+            self._settle(ch)
+            if ch.active_until is not None:
+                ch.active_until = None
+                ch.state = "Aborted"
+                self.stats["aborts"] += 1
+            ch.sticky = False
+            return {"OK": True}
+
+    def power(self, n):
+        with self.lock:
+            ch = self.channels.get(n)
+            if ch is None or self.mode == "Off":
+                return {"OK": False}
+            self._settle(ch)
+            pcfg = self.config["power"]
+            curve = pcfg.get(str(n), {"peak_mw": 100.0, "center_nm": ch.wavelength, "width_nm": 200.0})
+            x = (ch.wavelength - curve["center_nm"]) / curve["width_nm"]
+            p = curve["peak_mw"] * math.exp(-0.5 * x * x)
+            noise = pcfg.get("tuning_noise", 0.0) if ch.active_until is not None else pcfg.get("noise", 0.0)
+            return {"OK": True, "Power": round(max(0.0, p * (1 + self.rng.gauss(0.0, noise))), 4)}
+
+    def snapshot_stats(self):
+        with self.lock:
+            stats = json.loads(json.dumps(self.stats))
+        stats["sim_time_s"] = self.now()
+        stats["accel"] = self.accel
+        stats["tuning_real_s"] = stats["tuning_sim_s"] / self.accel
+        return stats
+
+class SimRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "CronusSim/0"
+    # Headers and body go out as separate writes; without TCP_NODELAY every
+    # keep-alive response stalls on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+    def _send(self, obj, code=200):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _payload(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _route(self, method):
+        sim = self.server.sim
+        payload = self._payload() if method == "PUT" else {}
+        path = self.path.split("?", 1)[0]
+        if not path.startswith(API_PREFIX):
+            return self._send({"OK": False, "Error": "Not found"}, 404)
+        parts = [p for p in path[len(API_PREFIX):].split("/") if p]
+        if parts[:1] == ["Sim"]:
+            return self._sim_route(method, parts[1:], payload)
+        endpoint = "/".join(["Ch{n}" if p.startswith("Ch") else p for p in parts])
+        sim.count(f"{method} /{endpoint}")
+        time.sleep(sim.latency())
+        if sim.is_down():
+            return self._send({"OK": False, "Error": "Service unavailable"}, 503)
+        if parts == ["Status"] and method == "GET":
+            return self._send({"OK": sim.mode != "Off", "Mode": sim.mode})
+        if parts == ["Mode"] and method == "GET":
+            return self._send({"OK": True, "Mode": sim.mode})
+        if parts == ["Off"] and method == "PUT":
+            sim.mode = "Off"
+            return self._send({"OK": True})
+        if len(parts) == 2 and parts[0].startswith("Ch") and parts[0][2:].isdigit():
+            n = int(parts[0][2:])
+            if n not in sim.channels:
+                return self._send({"OK": False, "Error": "Unknown channel"}, 404)
+            ch = sim.channels[n]
+            if parts[1] == "Status" and method == "GET":
+                return self._send(sim.channel_status(n))
+            if parts[1] == "WavelengthRange" and method == "GET":
+                return self._send({"OK": True, "IsEmpty": False, "Min": ch.min, "Max": ch.max})
+            if parts[1] == "Wavelength" and method == "GET":
+                return self._send({"OK": True, "Wavelength": ch.wavelength})
+            if parts[1] == "Wavelength" and method == "PUT":
+                return self._send(sim.set_wavelength(n, payload.get("Wavelength")))
+            if parts[1] == "Abort" and method == "PUT":
+                return self._send(sim.abort(n))
+            if parts[1] == "Power" and method == "GET":
+                return self._send(sim.power(n))
+        return self._send({"OK": False, "Error": "Not found"}, 404)
+
+    def _sim_route(self, method, parts, payload):
+        sim = self.server.sim
+        if parts == ["Stats"] and method == "GET":
+            return self._send(sim.snapshot_stats())
+        if parts == ["Reset"] and method == "PUT":
+            sim.reset()
+            return self._send({"OK": True})
+        if parts == ["Outage"] and method == "PUT":
+            sim.start_outage(payload.get("Seconds", 5.0))
+            return self._send({"OK": True})
+        return self._send({"OK": False, "Error": "Not found"}, 404)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+class SimulatorServer:
+    """HTTP front end for a CronusSimulator; start() serves from a daemon thread."""
+    def __init__(self, host="127.0.0.1", port=35100, config=None, seed=None, quiet=True):
+        self.sim = CronusSimulator(config, seed)
+        self.httpd = ThreadingHTTPServer((host, port), SimRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.sim = self.sim
+        self.httpd.quiet = quiet
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="cronus-sim", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cronus REST API simulator")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=35100)
+    ap.add_argument("--config", help="JSON file overriding DEFAULT_SIM_CONFIG")
+    ap.add_argument("--accel", type=float, help="time-acceleration factor")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args(argv)
+    overrides = {"accel": args.accel} if args.accel else None
+    server = SimulatorServer(args.host, args.port, load_sim_config(args.config, overrides),
+                             seed=args.seed, quiet=not args.verbose)
+    print(f"Cronus simulator on {server.url} (accel x{server.sim.accel:g})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,350 +1,170 @@
 import sys
 import os
-import json
 import time
-import random
+import math
+import bisect
+import threading
 import subprocess
+from collections import deque
 from datetime import datetime
-import requests
-import csv
 import io
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QLineEdit, QFrame, QScrollArea, QSpinBox, QGroupBox, QCheckBox,
+    QLineEdit, QFrame, QScrollArea, QSpinBox, QDoubleSpinBox, QGroupBox, QCheckBox,
     QTextEdit, QDialog, QFileDialog, QMessageBox, QMenu, QToolTip,
     QProgressBar, QComboBox, QRadioButton
 )
 from PyQt6.QtCore import (
-    Qt, QTimer, QThread, pyqtSignal, QPoint, QEasingCurve, QPropertyAnimation,
-    QRectF, pyqtProperty
+    Qt, QObject, QTimer, QThread, pyqtSignal, QPoint, QEasingCurve, QPropertyAnimation,
+    QPointF, QRectF, pyqtProperty
 )
 from PyQt6.QtGui import (
     QFont, QPixmap, QPainter, QColor, QPen, QBrush, QLinearGradient
 )
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
 
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-
-plt.rcParams['font.family'] = 'DejaVu Sans'
-
-API_BASE = "http://127.0.0.1:35100/v0/Cronus"
-
-DEFAULT_PARAMS = {
-    "test_min": None,
-    "test_max": None,
-    "wait_time": 3.0,
-    "cycles": 100,
-    "measure_power_curve": False
-}
-
-CONFIG_FILENAME = "cronus_app_config.json"
-CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILENAME)
-LOG_BASE = "D:/CronusTestingLogs"
-
-BASE_ZONE_DEFS = [
-    {"fixed_min": 670.0,   "fixed_max": 800.0,   "color": "#9ec5fe"},
-    {"fixed_min": 800.1,   "fixed_max": 960.0,   "color": "#d6bcfa"},
-    {"fixed_min": 940.0,   "fixed_max": 1100.0,  "color": "#fecaca"},
-    {"fixed_min": 1100.1,  "fixed_max": 1320.0,  "color": "#c8facc"},
-]
-
-def ensure_log_dirs():
-    os.makedirs(LOG_BASE, exist_ok=True)
-    return LOG_BASE
-
-def set_log_dir(new_dir: str):
-    global LOG_BASE
-    if new_dir:
-        try:
-            os.makedirs(new_dir, exist_ok=True)
-            LOG_BASE = new_dir
-        except Exception as e:
-            print(f"Failed to create log directory {new_dir}: {e}")
-    ensure_log_dirs()
-
-def safe_get_json(url, timeout=2):
-    try:
-        r = requests.get(url, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
-    except:
-        return None
-
-def safe_put_json(url, payload, timeout=3):
-    try:
-        r = requests.put(url, json=payload, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
-    except:
-        return None
-
-def check_connection(channel: int):
-    try:
-        response = safe_get_json(f"{API_BASE}/Ch{channel}/Status")
-        return response is not None and response.get("OK", False)
-    except:
-        return False
-
-def fetch_device_range(channel: int):
-    rng = safe_get_json(f"{API_BASE}/Ch{channel}/WavelengthRange")
-    if rng and rng.get("OK") and not rng.get("IsEmpty"):
-        try:
-            return (float(rng.get("Min")), float(rng.get("Max")))
-        except:
-            return (None, None)
-    return (None, None)
+import cronus_engine
+from cronus_engine import (
+    BASE_ZONE_DEFS, TRANSPORT, ENGINE, LOG_WRITER, STATUS_CACHE, ChannelRun,
+    discard_journal, fetch_device_range, fetch_device_ranges, find_resumable_journal, load_config, save_config,
+    set_log_dir, write_results_csv
+)
 
-def load_config():
-    global LOG_BASE
-    if os.path.exists(CONFIG_PATH):
-        try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            data = {}
-    else:
-        data = {}
-    LOG_BASE = data.get("log_dir", LOG_BASE)
-    ensure_log_dirs()
+_MPL = None
 
-    def merge_channel(raw):
-        merged = {}
-        merged["test_min"] = raw.get("test_min", None)
-        merged["test_max"] = raw.get("test_max", None)
-        merged["wait_time"] = raw.get("wait_time", DEFAULT_PARAMS["wait_time"])
-        merged["cycles"] = raw.get("cycles", DEFAULT_PARAMS["cycles"])
-        merged["measure_power_curve"] = raw.get("measure_power_curve", DEFAULT_PARAMS["measure_power_curve"])
-        return merged
+def _matplotlib():
+    """Import matplotlib's Figure on first use: only the PDF report's power curve
+    needs it, pyplot is never needed, and reportlab is imported by the report itself."""
+    global _MPL
+    if _MPL is None:
+        import matplotlib
+        from matplotlib.figure import Figure
+        matplotlib.rcParams['font.family'] = 'DejaVu Sans'
+        _MPL = Figure
+    return _MPL
 
-    # Zones
-    zones_cfg = data.get("zones")
-    def default_zone_list():
-        return [
-            {"name": "VIS1", "enabled": True, "min": BASE_ZONE_DEFS[0]["fixed_min"], "max": BASE_ZONE_DEFS[0]["fixed_max"]},
-            {"name": "VIS2", "enabled": True, "min": BASE_ZONE_DEFS[1]["fixed_min"], "max": BASE_ZONE_DEFS[1]["fixed_max"]},
-            {"name": "IR1",  "enabled": True, "min": BASE_ZONE_DEFS[2]["fixed_min"], "max": BASE_ZONE_DEFS[2]["fixed_max"]},
-            {"name": "IR2",  "enabled": True, "min": BASE_ZONE_DEFS[3]["fixed_min"], "max": BASE_ZONE_DEFS[3]["fixed_max"]},
-        ]
-    if not isinstance(zones_cfg, list) or len(zones_cfg) != 4:
-        zones_cfg = default_zone_list()
-    else:
-        for i, z in enumerate(zones_cfg):
-            if "name" not in z: z["name"] = f"Zone{i+1}"
-            if "enabled" not in z: z["enabled"] = True
-            base = BASE_ZONE_DEFS[i]
-            try:
-                zmin = float(z.get("min", base["fixed_min"]))
-                zmax = float(z.get("max", base["fixed_max"]))
-            except:
-                zmin, zmax = base["fixed_min"], base["fixed_max"]
-            if zmin >= zmax:
-                zmin, zmax = base["fixed_min"], base["fixed_max"]
-            z["min"] = zmin
-            z["max"] = zmax
+class UpdateBus(QObject):
+    """Batches worker events onto the GUI thread at most RATE_HZ times a second.
 
-    # Cronus apps launcher config
-    cronus_apps = data.get("cronus_apps")
-    if not isinstance(cronus_apps, list):
-        cronus_apps = []
-    # Each entry should be dict {name, path}
-    cleaned_apps = []
-    for app in cronus_apps:
-        if isinstance(app, dict) and "path" in app:
-            nm = app.get("name") or os.path.basename(app["path"])
-            cleaned_apps.append({"name": nm, "path": app["path"]})
-    cronus_apps = cleaned_apps
-    cronus_default = data.get("cronus_app_default", 0)
-    if not (0 <= cronus_default < len(cronus_apps)):
-        cronus_default = 0 if cronus_apps else -1
+    Events posted with a key are latest-value: only the newest `keep` posts
+    under that key survive until the flush. Everything else is delivered in
+    order. After each batch `flushed` fires, so panels can repaint once per
+    frame instead of once per event.
+    """
+    RATE_HZ = 10
+    flushed = pyqtSignal()
+    _wake = pyqtSignal()
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._seq = 0
+        self._armed = False
+        self._last_flush = 0.0
+        self._timer = QTimer(self); self._timer.setSingleShot(True); self._timer.timeout.connect(self._flush)
+        self._wake.connect(self._arm)
+    def post(self, signal, args, key=None, keep=1):
+        """Queue signal.emit(*args) for the next flush; safe from any thread."""
+        with self._lock:
+            if key is None:
+                self._seq += 1; self._pending[self._seq] = (signal, (args,))
+            else:
+                entry = self._pending.pop(key, None)
+                queue = entry[1] if entry else deque(maxlen=keep)
+                queue.append(args); self._pending[key] = (signal, queue)
+            if self._armed: return
+            self._armed = True
+        self._wake.emit()
+    def _arm(self):
+        wait = self._last_flush + 1.0 / self.RATE_HZ - time.monotonic()
+        self._timer.start(max(0, int(wait * 1000)))
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._armed = False
+        self._last_flush = time.monotonic()
+        for signal, queue in pending.values():
+            for args in queue: signal.emit(*args)
+        self.flushed.emit()
 
-    return {
-        "log_dir": LOG_BASE,
-        "ch1": merge_channel(data.get("ch1", {})),
-        "ch2": merge_channel(data.get("ch2", {})),
-        "show_zones": data.get("show_zones", False),
-        "zones": zones_cfg,
-        "cronus_apps": cronus_apps,
-        "cronus_app_default": cronus_default
-    }
+_BUS = None
 
-def save_config(cfg):
-    try:
-        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2)
-    except Exception as e:
-        print(f"Failed to save config: {e}")
+def update_bus():
+    """The GUI's UpdateBus, created on first use (from the GUI thread)."""
+    global _BUS
+    if _BUS is None: _BUS = UpdateBus()
+    return _BUS
 
-class StatusWorker(QThread):
+class StatusBridge(QObject):
+    """STATUS_CACHE subscriber: turns /Status and /Mode snapshots and link transitions into a queued Qt signal."""
     status_update = pyqtSignal(bool, str)
-    def __init__(self):
+    def __call__(self, path, data, ts):
+        ok = data is not None and data.get("OK", False)
+        if path == "/Status" and not ok:
+            self.status_update.emit(False, "Unknown")
+        elif path == "/Mode":
+            self.status_update.emit(True, data.get("Mode", "Unknown") if ok else "Unknown")
+    def on_link(self, online):
+        mode = (STATUS_CACHE.snapshot("/Mode")[0] or {}).get("Mode", "Unknown") if online else "Unknown"
+        self.status_update.emit(online, mode)
+
+class RangeFetcher(QThread):
+    range_fetched = pyqtSignal(int, object)
+    def __init__(self, channels):
         super().__init__()
-        self.running = True
+        self.channels = tuple(channels)
     def run(self):
-        while self.running:
-            try:
-                status_response = safe_get_json(f"{API_BASE}/Status")
-                connected = status_response is not None and status_response.get("OK", False)
-                mode = "Unknown"
-                if connected:
-                    mode_resp = safe_get_json(f"{API_BASE}/Mode")
-                    if mode_resp and mode_resp.get("OK"):
-                        mode = mode_resp.get("Mode", "Unknown")
-                self.status_update.emit(connected, mode)
-            except:
-                self.status_update.emit(False, "Unknown")
-            time.sleep(3)
-    def stop(self):
-        self.running = False
+        fetch_device_ranges(self.channels, on_result=self.range_fetched.emit)
 
-class TestWorker(QThread):
+class TestWorker(QObject):
+    """Qt bridge for a ChannelRun: forwards engine events as signals on the GUI thread."""
     update_status = pyqtSignal(bool, float, float)
     finished = pyqtSignal()
     progress_update = pyqtSignal(int, int)
     power_curve_finished = pyqtSignal(list)
-    connection_lost = pyqtSignal()
+    link_state = pyqtSignal(bool)
+    quiesced = pyqtSignal()
     command_sent = pyqtSignal(str)
     current_wavelength = pyqtSignal(float)
+    coverage_update = pyqtSignal(float)
+    run_estimate = pyqtSignal(float, float, float)
+    qualification_decided = pyqtSignal(str, int, float)
+    retest_progress = pyqtSignal(int, int)
+    retest_finished = pyqtSignal(list)
 
-    def __init__(self, channel: int, params: dict, device_range: tuple):
+    def __init__(self, channel: int, params: dict, device_range: tuple, engine=None, resume=None, zones=None):
         super().__init__()
         self.channel = channel
-        self.running = False
-        self.wait_time = params["wait_time"]
-        self.range_min = params["test_min"]
-        self.range_max = params["test_max"]
-        self.cycles = None if (params["cycles"] is None or params["cycles"] <= 0) else params["cycles"]
-        self.measure_power_curve = params["measure_power_curve"]
-        self.fail_log_file = None
-        self.test_results = []
-        self.power_curve_data = []
-        self.device_min, self.device_max = device_range
+        self.engine = engine or ENGINE
+        self.run_state = ChannelRun(channel, params, device_range, emit=self._emit, resume=resume, zones=zones)
+        self._done = None
 
-        if self.device_min is None or self.device_max is None:
-            self.range_min = None
-            self.range_max = None
-        else:
-            if self.range_min is None or self.range_max is None:
-                self.range_min, self.range_max = self.device_min, self.device_max
-            self.range_min = max(self.range_min, self.device_min)
-            self.range_max = min(self.range_max, self.device_max)
-            if self.range_min >= self.range_max:
-                self.range_min, self.range_max = self.device_min, self.device_max
+    # Idempotent displays only need the newest value(s); every other event is delivered in order
+    COALESCED = {"progress_update": 1, "current_wavelength": 1, "coverage_update": 1, "run_estimate": 1,
+                 "retest_progress": 1, "command_sent": 5}
 
-    def configure_logs(self):
-        ensure_log_dirs()
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.fail_log_file = os.path.join(LOG_BASE, f"Ch{self.channel}_wavelength_failures_{ts}.txt")
-        with open(self.fail_log_file, "w") as f:
-            f.write(f"Cronus Ch{self.channel} Wavelength Failures Log\n")
-            f.write(f"Test started: {datetime.now():%Y-%m-%d %H:%M:%S}\n")
-            f.write("-" * 50 + "\n")
+    def _emit(self, name, *args):
+        keep = self.COALESCED.get(name)
+        update_bus().post(getattr(self, name), args, None if keep is None else (id(self), name), keep or 1)
 
-    def run(self):
-        self.configure_logs()
-        self.running = True
-        attempts = 0
-        self.test_results = []
-        if self.range_min is None or self.range_max is None:
-            self.finished.emit()
-            return
-        while self.running and (self.cycles is None or attempts < self.cycles):
-            if not check_connection(self.channel):
-                self.connection_lost.emit()
-                time.sleep(2)
-                continue
-            wl = round(random.uniform(self.range_min, self.range_max), 1)
-            wl = min(max(wl, self.device_min), self.device_max)
-            self.current_wavelength.emit(wl)
-            success, duration = self._perform_wavelength_attempt(wl)
-            attempts += 1
-            self.test_results.append({
-                "timestamp": datetime.now(),
-                "wavelength": wl,
-                "wl_success": success,
-                "wl_duration": duration
-            })
-            self.update_status.emit(success, duration, wl)
-            self.progress_update.emit(attempts, self.cycles or 0)
-            if not success:
-                with open(self.fail_log_file, "a") as f:
-                    f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} - Failed wavelength: "
-                            f"{wl} nm (Duration: {duration:.1f}s)\n")
-            time.sleep(self.wait_time + 3)  # post-set wait + margin
-        if self.measure_power_curve and self.running and self.range_min is not None:
-            self._measure_power_curve()
-        self.finished.emit()
+    @property
+    def results(self):
+        return self.run_state.results
 
-    def _perform_wavelength_attempt(self, wl):
-        start_time = time.time()
-        self.command_sent.emit(f"PUT /Ch{self.channel}/Wavelength: {wl} nm")
-        put_resp = safe_put_json(f"{API_BASE}/Ch{self.channel}/Wavelength", {"OK": True, "Wavelength": wl})
-        if put_resp is None:
-            self.connection_lost.emit()
-            return False, time.time() - start_time
-        active_started = False
-        for _ in range(10):
-            if not self.running: break
-            self.command_sent.emit(f"GET /Ch{self.channel}/Status")
-            st = safe_get_json(f"{API_BASE}/Ch{self.channel}/Status")
-            if st is None:
-                self.connection_lost.emit()
-                time.sleep(0.5); continue
-            if st.get("IsWavelengthSettingActive", False):
-                active_started = True
-                break
-            time.sleep(0.5)
-        if not active_started:
-            return False, time.time() - start_time
-        success = False
-        for _ in range(120):
-            if not self.running: break
-            self.command_sent.emit(f"GET /Ch{self.channel}/Status")
-            st = safe_get_json(f"{API_BASE}/Ch{self.channel}/Status")
-            if st is None:
-                self.connection_lost.emit()
-                time.sleep(1); continue
-            if not st.get("IsWavelengthSettingActive", True):
-                if st.get("WavelengthSettingState", "") == "Success":
-                    success = True
-                break
-            time.sleep(1)
-        return success, time.time() - start_time
+    def start(self):
+        if self.isRunning(): return
+        self._done = self.engine.start(self.run_state)
 
-    def _measure_power_curve(self):
-        if self.range_min is None or self.range_max is None:
-            self.power_curve_finished.emit([])
-            return
-        self.power_curve_data = []
-        span = self.range_max - self.range_min
-        if span < 10:
-            wls = [int((self.range_min + self.range_max) / 2)]
-        else:
-            wls = list(range(int(self.range_min), int(self.range_max) + 1, 10))
-            if wls[-1] < int(self.range_max):
-                wls.append(int(self.range_max))
-        for wl in wls:
-            if not self.running: break
-            if not check_connection(self.channel):
-                self.connection_lost.emit()
-                time.sleep(2)
-                if not check_connection(self.channel): break
-            wl = min(max(wl, self.device_min), self.device_max)
-            success, _ = self._perform_wavelength_attempt(wl)
-            if success:
-                time.sleep(3)
-                self.command_sent.emit(f"GET /Ch{self.channel}/Power")
-                p = safe_get_json(f"{API_BASE}/Ch{self.channel}/Power")
-                if p and p.get("OK"):
-                    self.power_curve_data.append({"wavelength": wl, "power": p.get("Power", 0.0)})
-        self.power_curve_finished.emit(self.power_curve_data)
+    def stop(self):
+        self.engine.cancel(self.run_state)
+
+    def isRunning(self):
+        return self._done is not None and not self._done.is_set()
+
+    def wait(self, msecs=None):
+        if self._done is None: return True
+        return self._done.wait(None if msecs is None else msecs / 1000.0)
 
 class SmoothProgressBar(QProgressBar):
     SHOW_PERCENT_TEXT = False
@@ -406,28 +226,229 @@ class SmoothProgressBar(QProgressBar):
             painter.drawText(rect,Qt.AlignmentFlag.AlignCenter,f"{percent:.0f}%")
         painter.end()
 
+class DonutWidget(QWidget):
+    """Success/fail ring with the success rate in the middle, painted directly."""
+    SUCCESS_COLOR = QColor("#34C759")
+    FAIL_COLOR = QColor("#FF3B30")
+    EMPTY_COLOR = QColor("#eef2f7")
+    SHADOW_COLOR = QColor(0, 0, 0, 10)
+    TEXT_COLOR = QColor("#0f172a")
+    EMPTY_TEXT_COLOR = QColor("#94a3b8")
+    RING_WIDTH = 0.23
+    def __init__(self,*args,**kwargs):
+        super().__init__(*args,**kwargs)
+        self.success=0; self.fail=0
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground,True)
+    def set_counts(self,success,fail):
+        if (success,fail)==(self.success,self.fail): return
+        self.success=success; self.fail=fail; self.update()
+    def paintEvent(self,event):
+        painter=QPainter(self); painter.setRenderHint(QPainter.RenderHint.Antialiasing,True)
+        side=min(self.width(),self.height())*0.82; ring=side/2*self.RING_WIDTH
+        outer=QRectF((self.width()-side)/2,(self.height()-side)/2,side,side)
+        arc=outer.adjusted(ring/2,ring/2,-ring/2,-ring/2); total=self.success+self.fail
+        painter.setPen(Qt.PenStyle.NoPen)
+        if total>0:
+            painter.setBrush(QBrush(self.SHADOW_COLOR)); painter.drawEllipse(outer)
+            # Qt angles are 1/16 degree, counter-clockwise from 3 o'clock; the ring runs clockwise from 12
+            success_span=round(-5760*self.success/total)
+            for start,span,color in ((1440,success_span,self.SUCCESS_COLOR),
+                                     (1440+success_span,-5760-success_span,self.FAIL_COLOR)):
+                if not span: continue
+                painter.setPen(QPen(color,ring,Qt.PenStyle.SolidLine,Qt.PenCapStyle.FlatCap))
+                painter.drawArc(arc,start,span)
+            if self.success and self.fail:
+                painter.setPen(QPen(Qt.GlobalColor.white,2)); painter.save()
+                painter.translate(outer.center())
+                for deg in (0.0,-360*self.success/total):
+                    painter.save(); painter.rotate(-90-deg)
+                    painter.drawLine(QPointF(side/2-ring,0),QPointF(side/2,0)); painter.restore()
+                painter.restore()
+            text=f"{self.success/total*100:.0f}%"; text_color=self.TEXT_COLOR; size=26
+        else:
+            painter.setBrush(QBrush(self.EMPTY_COLOR)); painter.drawEllipse(outer)
+            text="–%"; text_color=self.EMPTY_TEXT_COLOR; size=24
+        font=painter.font(); font.setPointSize(size); font.setBold(True); painter.setFont(font)
+        painter.setPen(text_color); painter.drawText(outer,Qt.AlignmentFlag.AlignCenter,text)
+        painter.end()
+
+class WavelengthMapWidget(QWidget):
+    """Strip of tested wavelengths, one lane per result, over the optional zone bands.
+
+    Points are added one at a time and only their own column is repainted.
+    Once a lane holds more bars than fit side by side it is drawn from
+    per-pixel-column counts rather than bar by bar, so a frame costs the
+    same for a hundred thousand points as for a hundred.
+    """
+    # bottom, face, edge, legend label per bar status
+    BAR_STYLE={'failed':(0.0,'#ef4444','#dc2626','Failed'),'success':(0.5,'#22c55e','#16a34a','Success')}
+    BAR_HEIGHT=0.4
+    TEXT_COLOR=QColor("#1e293b")
+    GRID_COLOR=QColor("#cbd5e1")
+    MARGINS=(24,26,24,78)  # left, top (zone labels), right, bottom (ticks, axis label, legend)
+    def __init__(self,data,*args,**kwargs):
+        super().__init__(*args,**kwargs)
+        self.data=data; self.index={st:[] for st in self.BAR_STYLE}; self.success=0
+        self.lo,self.hi=660.0,910.0; self.bar_w=1.0; self.zones=[]
+        self._bins=None; self._bins_width=0; self.dragging=False
+        self.setMinimumHeight(260); self.setMouseTracking(False)
+    def set_view(self,lo,hi,bar_w,zones):
+        """Re-index `data` and show [lo, hi]; zones are (label, min, max, color) bands."""
+        self.lo,self.hi,self.bar_w,self.zones=lo,hi,bar_w,zones
+        for st,lane in self.index.items(): lane[:]=sorted(wl for wl,state in self.data.items() if state==st)
+        self.success=len(self.index['success']); self._bins=None; self.update()
+    def add(self,wl,status,prev):
+        """Account for data[wl] having become `status`; False means it needs a set_view first."""
+        if prev is not None:
+            lane=self.index[prev]; del lane[bisect.bisect_left(lane,wl)]
+        bisect.insort(self.index[status],wl)
+        self.success+=(status=='success')-(prev=='success')
+        if prev is None and len(self.data)==1 or not self.lo<=wl-self.bar_w/2<=wl+self.bar_w/2<=self.hi: return False
+        plot=self._plot_rect(); x=self._x(wl,plot)
+        if self._bins is not None:
+            col=min(max(int(x-plot.left()),0),len(self._bins[status])-1)
+            self._bins[status][col]+=1
+            if prev is not None: self._bins[prev][col]-=1
+        half=self.bar_w/2*plot.width()/(self.hi-self.lo)
+        self.update(int(x-half)-2,int(plot.top())-2,int(2*half)+5,int(plot.height())+4)
+        return True
+    def _plot_rect(self):
+        l,t,r,b=self.MARGINS
+        return QRectF(l,t,max(self.width()-l-r,1),max(self.height()-t-b,1))
+    def _x(self,wl,plot): return plot.left()+(wl-self.lo)*plot.width()/(self.hi-self.lo)
+    def _y(self,y,plot): return plot.bottom()-y*plot.height()
+    def _lane_bins(self,plot):
+        """Points per pixel column for each lane, rebuilt only when the view or the width changed."""
+        width=int(plot.width())
+        if self._bins is None or self._bins_width!=width:
+            scale=plot.width()/(self.hi-self.lo); self._bins={}; self._bins_width=width
+            for st,lane in self.index.items():
+                counts=self._bins[st]=[0]*width
+                for wl in lane: counts[min(max(int((wl-self.lo)*scale),0),width-1)]+=1
+        return self._bins
+    def _ticks(self):
+        raw=(self.hi-self.lo)/8; mag=10**math.floor(math.log10(raw)) if raw>0 else 1
+        step=next(m*mag for m in (1,2,5,10) if m*mag>=raw)
+        t=math.ceil(self.lo/step)*step
+        while t<=self.hi: yield t; t+=step
+    def paintEvent(self,event):
+        painter=QPainter(self); painter.setRenderHint(QPainter.RenderHint.Antialiasing,False)
+        plot=self._plot_rect(); painter.fillRect(plot,Qt.GlobalColor.white)
+        font=painter.font(); font.setPointSize(9); painter.setFont(font)
+        for label,zmin,zmax,color in self.zones:
+            x0=self._x(zmin,plot); x1=self._x(zmax,plot); band=QColor(color); band.setAlphaF(0.22)
+            painter.fillRect(QRectF(x0,plot.top(),x1-x0,plot.height()),band)
+            font.setBold(True); painter.setFont(font); painter.setPen(QColor("#334155"))
+            painter.drawText(QRectF(x0,0,x1-x0,plot.top()-2),
+                             Qt.AlignmentFlag.AlignHCenter|Qt.AlignmentFlag.AlignBottom,label)
+        font.setBold(False); painter.setFont(font)
+        grid=QColor(self.GRID_COLOR); grid.setAlphaF(0.4)
+        for t in self._ticks():
+            x=self._x(t,plot); painter.setPen(QPen(grid,1,Qt.PenStyle.DashLine))
+            painter.drawLine(QPointF(x,plot.top()),QPointF(x,plot.bottom()))
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(QRectF(x-30,plot.bottom()+4,60,16),Qt.AlignmentFlag.AlignHCenter,f"{t:g}")
+        painter.setPen(QPen(self.GRID_COLOR,1.4)); painter.drawLine(plot.bottomLeft(),plot.bottomRight())
+        painter.setClipRect(plot)
+        scale=plot.width()/(self.hi-self.lo); half=max(self.bar_w/2*scale,0.5)
+        clip=event.rect(); c0=self.lo+(clip.left()-plot.left()-half)/scale; c1=self.lo+(clip.right()-plot.left()+half)/scale
+        for st,(bottom,fc,ec,_) in self.BAR_STYLE.items():
+            lane=self.index[st]; y1=self._y(bottom,plot); y0=self._y(bottom+self.BAR_HEIGHT,plot)
+            if len(lane)*2*half<=plot.width():
+                painter.setPen(QPen(QColor(ec),1.2)); painter.setBrush(QColor(fc))
+                painter.drawRects([QRectF(self._x(wl,plot)-half,y0,2*half,y1-y0)
+                                   for wl in lane[bisect.bisect_left(lane,c0):bisect.bisect_right(lane,c1)]])
+                continue
+            # level of detail: merge the bar footprints of occupied pixel columns into runs
+            painter.setPen(Qt.PenStyle.NoPen); painter.setBrush(QColor(fc)); run=None
+            for col,n in enumerate(self._lane_bins(plot)[st]):
+                if not n: continue
+                x=plot.left()+col+0.5; a,b=x-half,x+half
+                if run and a<=run[1]: run[1]=b; continue
+                if run: painter.drawRect(QRectF(run[0],y0,run[1]-run[0],y1-y0))
+                run=[a,b]
+            if run: painter.drawRect(QRectF(run[0],y0,run[1]-run[0],y1-y0))
+        painter.setClipping(False)
+        if not self.data:
+            font.setPointSize(12); painter.setFont(font); painter.setPen(QColor("#64748b"))
+            painter.drawText(plot,Qt.AlignmentFlag.AlignCenter,"No wavelengths tested yet")
+        font.setPointSize(11); font.setBold(True); painter.setFont(font); painter.setPen(self.TEXT_COLOR)
+        painter.drawText(QRectF(plot.left(),plot.bottom()+22,plot.width(),20),Qt.AlignmentFlag.AlignHCenter,
+                         "Wavelength (nm)")
+        if self.data: self._paint_legend(painter,plot)
+        painter.end()
+    def _paint_legend(self,painter,plot):
+        font=painter.font(); font.setPointSize(10); painter.setFont(font); fm=painter.fontMetrics()
+        items=[(fc,ec,label) for _,fc,ec,label in self.BAR_STYLE.values()]
+        width=sum(28+fm.horizontalAdvance(label) for *_,label in items)+16*(len(items)-1)+24
+        box=QRectF(plot.center().x()-width/2,plot.bottom()+46,width,26)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing,True)
+        painter.setPen(QPen(self.GRID_COLOR,1)); painter.setBrush(Qt.GlobalColor.white)
+        painter.drawRoundedRect(box,4,4); x=box.left()+12
+        for fc,ec,label in items:
+            painter.setPen(QPen(QColor(ec),1.2)); painter.setBrush(QColor(fc))
+            painter.drawRect(QRectF(x,box.center().y()-5,20,10)); x+=28
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(QRectF(x,box.top(),fm.horizontalAdvance(label)+2,box.height()),
+                             Qt.AlignmentFlag.AlignVCenter,label)
+            x+=fm.horizontalAdvance(label)+16
+    def hit(self,pos):
+        """Wavelength of the bar under widget position `pos`, or None; bisects the lane's sorted index."""
+        plot=self._plot_rect()
+        if not plot.contains(QPointF(pos)): return None
+        scale=plot.width()/(self.hi-self.lo); x=self.lo+(pos.x()-plot.left())/scale
+        y=(plot.bottom()-pos.y())/plot.height(); reach=max(self.bar_w/2,0.5/scale)
+        for st,lane in self.index.items():
+            bottom=self.BAR_STYLE[st][0]
+            if not bottom<=y<=bottom+self.BAR_HEIGHT or not lane: continue
+            i=bisect.bisect_left(lane,x)
+            near=min(lane[max(i-1,0):i+1],key=lambda wl: abs(wl-x))
+            if abs(near-x)<=reach: return near
+        return None
+    def mousePressEvent(self,event):
+        if event.button()==Qt.MouseButton.LeftButton: self.dragging=True; self._show_tip(event)
+    def mouseReleaseEvent(self,event):
+        self.dragging=False; QToolTip.hideText()
+    def mouseMoveEvent(self,event):
+        if self.dragging: self._show_tip(event)
+    def _show_tip(self,event):
+        pos=event.position().toPoint(); wl=self.hit(pos)
+        if wl is None: QToolTip.hideText(); return
+        status=self.BAR_STYLE[self.data[wl]][3]
+        text=f"{wl:.1f} nm - {'✓' if status=='Success' else '✗'} {status}"
+        QToolTip.showText(self.mapToGlobal(pos)+QPoint(12,12),text,self,msecShowTime=1200)
+
 class ChannelPanel(QFrame):
     STATUS_COLORS = {
         "Standby": "#27ae60",
         "Running": "#34495e",
         "Power Curve": "#eab308",
+        "Re-testing": "#8e44ad",
+        "Reconnecting": "#f59e0b",
+        "Stopping": "#94a3b8",
         "Completed": "#27ae60",
+        "Qualified PASS": "#27ae60",
+        "Qualified FAIL": "#e74c3c",
         "Range Unknown": "#f59e0b",
+        "Reading Range": "#94a3b8",
         "Error": "#e74c3c"
     }
-    def __init__(self,channel:int,get_params_callable,get_device_range_callable):
+    def __init__(self,channel:int,get_params_callable,get_device_range_callable,get_zones_callable=None):
         super().__init__()
         self.channel=channel
         self.get_params_callable=get_params_callable
         self.get_device_range_callable=get_device_range_callable
+        self.get_zones_callable=get_zones_callable
         self.worker=None; self.aborted=False; self.needs_reset_next_start=False
         self.timer=QTimer(); self.timer.timeout.connect(self._update_timer)
+        self._stats_dirty=False; self._log_dirty=False; update_bus().flushed.connect(self._apply_updates)
         self.elapsed_seconds=0
         self.success_count=0; self.fail_count=0; self.total_time=0.0
-        self.durations=[]; self.wavelengths=[]; self.success_wavelengths=[]; self.failed_wavelengths=[]
-        self.power_curve_data=[]; self.command_log=[]
+        self.total_duration=0.0
+        self.power_curve_data=[]; self.command_log=deque(maxlen=5)
         self.is_test_completed=False; self.wavelength_tested=None
-        self.total_cycles=None; self.current_wait_time=0.0; self.latest_eta="-"
+        self.total_cycles=None; self.current_dwell_estimate=0.0; self.latest_eta="-"
+        self.run_estimate=None; self.qualification=None; self.retest_regions=[]; self._status_before_link="Running"
         self.device_min,self.device_max=self.get_device_range_callable(self.channel)
         self._apply_style(); self._build_ui()
         self.refresh_param_summary()
@@ -476,6 +497,7 @@ class ChannelPanel(QFrame):
         self.fail_label=self._chip_label("Failed: 0","#fdecec","#7f1d1d")
         self.avg_label=self._chip_label("Avg: 0.0s","#f1f5f9","#475569")
         self.rate_label=self._chip_label("Rate: 0%","#f1f5f9","#475569")
+        self.coverage_label=self._chip_label("Coverage: 0%","#eef2ff","#3730a3")
         drop_row1=QHBoxLayout()
         self.success_dropdown_btn=QPushButton("▼"); self.success_dropdown_btn.setFixedWidth(26)
         self.success_dropdown_btn.setStyleSheet(self._dropdown_button_style())
@@ -487,11 +509,11 @@ class ChannelPanel(QFrame):
         self.fail_dropdown_btn.clicked.connect(self._show_fail_wavelengths)
         drop_row2.addWidget(self.fail_label); drop_row2.addWidget(self.fail_dropdown_btn); drop_row2.addStretch()
         stats_col.addLayout(drop_row1); stats_col.addLayout(drop_row2)
-        stats_col.addWidget(self.avg_label); stats_col.addWidget(self.rate_label); stats_col.addStretch()
+        stats_col.addWidget(self.avg_label); stats_col.addWidget(self.rate_label)
+        stats_col.addWidget(self.coverage_label); stats_col.addStretch()
         stats_chart.addLayout(stats_col)
-        self.fig,self.ax=plt.subplots(figsize=(3.4,2.7))
-        self.fig.patch.set_facecolor('#ffffff'); self.canvas=FigureCanvas(self.fig)
-        stats_chart.addWidget(self.canvas); main.addLayout(stats_chart)
+        self.chart=DonutWidget(); self.chart.setFixedSize(340,270)
+        stats_chart.addWidget(self.chart); main.addLayout(stats_chart)
         cmd_label=QLabel("Commands (Last 5)")
         cmd_label.setStyleSheet("font-weight:600;font-size:11px;margin-top:4px;")
         main.addWidget(cmd_label)
@@ -546,12 +568,26 @@ class ChannelPanel(QFrame):
             dev_text=f"Device Range: {self.device_min:.1f}–{self.device_max:.1f} nm"
             if not (self.worker and self.worker.isRunning()):
                 self.start_btn.setEnabled(True)
-        summary=(f"{range_text}  |  Post-set Wait {params['wait_time']:.1f}s  |  "
+        if params.get('dwell_mode')=="ready":
+            wait_text=f"Post-set Wait ≤{params['wait_time']:.1f}s (until ready{', power' if params.get('power_stability') else ''})"
+        else:
+            wait_text=f"Post-set Wait {params['wait_time']:.1f}s"
+        seq=params.get('sequence','random')
+        seq_text="" if seq=="random" else f"  |  Sequence {seq.capitalize()}"
+        profile=params.get('jump_profile','none')
+        if profile=="target": seq_text+=f"  |  Jumps ~{params.get('target_jump',50.0):g} nm"
+        elif profile!="none": seq_text+=f"  |  Jumps {profile.replace('_',' ').capitalize()}"
+        if params.get('qualification'):
+            seq_text+=(f"  |  Qualify {params.get('spec_rate',95.0):g}% ±{params.get('qual_margin',3.0):g}"
+                       f" @ {params.get('qual_confidence',95.0):g}% conf.")
+        if params.get('retest'): seq_text+=f"  |  Re-test ×{params.get('retest_repeats',3)}"
+        summary=(f"{range_text}  |  {wait_text}  |  "
                  f"Cycles {params['cycles'] if params['cycles'] and params['cycles']>0 else '∞'}  |  "
-                 f"PowerCurve {'Yes' if params['measure_power_curve'] else 'No'}\n{dev_text}")
+                 f"PowerCurve {'Yes' if params['measure_power_curve'] else 'No'}{seq_text}\n{dev_text}")
         self.param_summary.setText(summary)
     def _update_timer(self):
-        self.elapsed_seconds+=1
+        self.elapsed_seconds+=1; self._show_time()
+    def _show_time(self):
         h=self.elapsed_seconds//3600; m=(self.elapsed_seconds%3600)//60; s=self.elapsed_seconds%60
         elapsed_str=f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
         self.time_combo_label.setText(f"Elapsed: {elapsed_str}   ETA: {self.latest_eta}")
@@ -560,52 +596,39 @@ class ChannelPanel(QFrame):
         attempts_done=self.success_count+self.fail_count
         remaining=self.total_cycles-attempts_done
         if remaining<=0: self.latest_eta="0s"; return
-        if not self.durations: self.latest_eta="-"; return
-        avg_set_time=sum(self.durations)/len(self.durations)
-        per_cycle_est=avg_set_time+self.current_wait_time+3
-        rem=remaining*per_cycle_est
-        if rem<3600:
-            m=int(rem//60); s=int(rem%60); self.latest_eta=f"{m:02d}:{s:02d}"
-        else:
-            h=int(rem//3600); m=int((rem%3600)//60); s=int(rem%60)
-            self.latest_eta=f"{h:02d}:{m:02d}:{s:02d}"
-    def _update_chart(self):
-        self.ax.clear(); total=self.success_count+self.fail_count
-        self.ax.set_aspect('equal'); ring_width=0.23
-        if total>0:
-            sizes=[self.success_count,self.fail_count]; colors_ring=['#34C759','#FF3B30']
-            self.ax.pie(sizes,startangle=90,colors=colors_ring,radius=1.0,counterclock=False,
-                        labels=None,wedgeprops=dict(width=ring_width,edgecolor='#ffffff',linewidth=2,antialiased=True))
-            shadow=plt.Circle((0,0),1.0,color='black',alpha=0.04,zorder=0); self.ax.add_patch(shadow)
-            success_rate=(self.success_count/total)*100
-            self.ax.text(0.5,0.5,f"{success_rate:.0f}%",ha='center',va='center',
-                         fontsize=26,fontweight='bold',color='#0f172a')
-        else:
-            placeholder=plt.Circle((0,0),1,color='#eef2f7',zorder=0); self.ax.add_patch(placeholder)
-            self.ax.text(0.5,0.5,"–%",ha='center',va='center',fontsize=24,fontweight='bold',color='#94a3b8')
-        self.ax.set_xlim(-1.1,1.1); self.ax.set_ylim(-1.1,1.1); self.ax.axis('off'); self.canvas.draw()
+        if self.run_estimate is not None:
+            rem,low,high=self.run_estimate
+            self.latest_eta=f"{self._fmt_span(rem)} (±{self._fmt_span((high-low)/2)})"; return
+        if not attempts_done: self.latest_eta="-"; return
+        avg_set_time=self.total_duration/attempts_done
+        per_cycle_est=avg_set_time+self.current_dwell_estimate
+        self.latest_eta=self._fmt_span(remaining*per_cycle_est)
+    @staticmethod
+    def _fmt_span(sec):
+        if sec<3600: return f"{int(sec//60):02d}:{int(sec%60):02d}"
+        return f"{int(sec//3600):02d}:{int((sec%3600)//60):02d}:{int(sec%60):02d}"
+    def _update_chart(self): self.chart.set_counts(self.success_count,self.fail_count)
     def _clear_statistics(self):
-        self.success_count=0; self.fail_count=0; self.total_time=0.0; self.durations.clear()
-        self.wavelengths.clear(); self.success_wavelengths.clear(); self.failed_wavelengths.clear()
+        self.success_count=0; self.fail_count=0; self.total_time=0.0; self.total_duration=0.0
         self.power_curve_data.clear(); self.command_log.clear(); self.command_log_display.clear()
         self.is_test_completed=False; self.attempts_label.setText("Attempts: 0")
         self.avg_label.setText("Avg: 0.0s"); self.success_label.setText("Success: 0")
         self.fail_label.setText("Failed: 0"); self.rate_label.setText("Rate: 0%")
+        self.coverage_label.setText("Coverage: 0%"); self.run_estimate=None; self.qualification=None
+        self.retest_regions=[]
         self.elapsed_seconds=0; self.latest_eta="-"
         self.time_combo_label.setText("Elapsed: 0s   ETA: -")
         self._update_chart(); self.report_btn.setEnabled(False); self.export_btn.setEnabled(False)
     def _show_success_wavelengths(self):
-        if not self.success_wavelengths: return
+        if not (self.worker and self.success_count): return
         menu=QMenu(self)
-        for wl in list(self.success_wavelengths)[-150:][::-1]:
-            pass  # unreachable; corrected below
-        for wl in list(self.success_wavelengths)[-150:][::-1]:
+        for wl in self.worker.results.recent_wavelengths(True,150):
             menu.addAction(f"{wl:.1f} nm")
         menu.exec(self.success_dropdown_btn.mapToGlobal(self.success_dropdown_btn.rect().bottomLeft()))
     def _show_fail_wavelengths(self):
-        if not self.failed_wavelengths: return
+        if not (self.worker and self.fail_count): return
         menu=QMenu(self)
-        for wl in list(self.failed_wavelengths)[-150:][::-1]:
+        for wl in self.worker.results.recent_wavelengths(False,150):
             menu.addAction(f"{wl:.1f} nm")
         menu.exec(self.fail_dropdown_btn.mapToGlobal(self.fail_dropdown_btn.rect().bottomLeft()))
     def on_start(self):
@@ -625,11 +648,29 @@ class ChannelPanel(QFrame):
                 params['test_min'],params['test_max']=device_min,device_max
         if self.needs_reset_next_start or (self.success_count or self.fail_count):
             self._clear_statistics()
-        self.needs_reset_next_start=False; self.aborted=False
+        self._launch(params,(device_min,device_max))
+    def resume_run(self,state):
+        """Continue an interrupted run from its journal (a JournalState from find_resumable_journal)."""
+        if self.worker and self.worker.isRunning(): return
+        self._clear_statistics()
+        res=state.results
+        self.success_count=res.success_count; self.fail_count=res.fail_count
+        self.total_time=res.success_time; self.total_duration=res.total_duration
+        self._launch(dict(state.params),state.device_range,resume=state)
+        self._refresh_stats(); self._update_chart()
+        self.on_progress(len(res),self.total_cycles or 0)
+        if self.worker.run_state.sequence: self.on_coverage(self.worker.run_state.sequence.coverage.fraction)
+    def _launch(self,params,device_range,resume=None):
+        self.needs_reset_next_start=False; self.aborted=False; self.run_estimate=None; self.qualification=None
         self.refresh_param_summary()
-        self.worker=TestWorker(self.channel,params,(device_min,device_max))
+        zones=self.get_zones_callable() if self.get_zones_callable else None
+        self.worker=TestWorker(self.channel,params,device_range,resume=resume,zones=zones)
         self.total_cycles=params['cycles'] if params['cycles'] and params['cycles']>0 else None
-        self.current_wait_time=params['wait_time']
+        if params.get('dwell_mode')=="ready":
+            self.current_dwell_estimate=(ChannelRun.POWER_STABLE_SAMPLES*ChannelRun.READY_POLL_INTERVAL
+                                         if params.get('power_stability') else 0.0)
+        else:
+            self.current_dwell_estimate=params['wait_time']+ChannelRun.FIXED_DWELL_MARGIN
         if self.total_cycles:
             self.progress_bar.setMaximum(self.total_cycles); self.progress_bar.setValue(0)
             self.progress_bar.setVisible(True); self.progress_info_label.setVisible(True)
@@ -641,47 +682,96 @@ class ChannelPanel(QFrame):
         self.worker.finished.connect(self.on_worker_finished)
         self.worker.power_curve_finished.connect(self.on_power_curve_finished)
         self.worker.command_sent.connect(self.on_command_sent)
+        self.worker.coverage_update.connect(self.on_coverage)
+        self.worker.run_estimate.connect(self.on_run_estimate)
+        self.worker.qualification_decided.connect(self.on_qualified)
+        self.worker.link_state.connect(self.on_link_state)
+        self.worker.quiesced.connect(self.on_quiesced)
+        self.worker.retest_progress.connect(self.on_retest_progress)
+        self.worker.retest_finished.connect(self.on_retest_finished)
         self.worker.start(); self._set_status("Running")
         self.elapsed_seconds=0; self.latest_eta="-" if self.total_cycles else "∞"
         self.timer.start(1000); self.start_btn.setEnabled(False)
     def on_stop(self):
-        if not self.worker or not self.worker.isRunning(): return
-        self.aborted=True; self.worker.running=False; self.worker.wait(150)
+        # once Stopping, the run is already winding down; cancelling again would only interrupt that
+        if not self.worker or not self.worker.isRunning() or self.status_pill.text()=="Stopping": return
+        self.aborted=True; self.worker.stop()
         if self.timer.isActive(): self.timer.stop()
-        self._set_status("Standby" if self.device_min is not None else "Range Unknown")
-        self.start_btn.setEnabled(True); self.latest_eta="-"
+        self._set_status("Stopping"); self.start_btn.setEnabled(False); self.latest_eta="-"
         self.time_combo_label.setText("Elapsed: 0s   ETA: -"); self.needs_reset_next_start=True
     def on_reset(self):
-        if self.worker and self.worker.isRunning():
-            self.aborted=True; self.worker.running=False; self.worker.wait(150)
+        stopping=bool(self.worker and self.worker.isRunning())
+        if stopping and self.status_pill.text()!="Stopping": self.aborted=True; self.worker.stop()
         if self.timer.isActive(): self.timer.stop()
         self._clear_statistics(); self.needs_reset_next_start=False
+        if stopping: self._set_status("Stopping"); self.start_btn.setEnabled(False)
+        else:
+            self._set_status("Standby" if self.device_min is not None else "Range Unknown")
+            self.start_btn.setEnabled(self.device_min is not None)
+        self.progress_bar.setVisible(False); self.progress_info_label.setVisible(False)
+    def on_quiesced(self):
+        """The run has unwound and no request is still on the wire: only now is the bench free."""
+        if not self.aborted: return
         self._set_status("Standby" if self.device_min is not None else "Range Unknown")
         self.start_btn.setEnabled(self.device_min is not None)
-        self.progress_bar.setVisible(False); self.progress_info_label.setVisible(False)
     def on_command_sent(self,cmd):
         ts=datetime.now().strftime("%H:%M:%S"); entry=f"[{ts}] {cmd}"
         if self.command_log and self.command_log[0]==entry: return
-        self.command_log.insert(0,entry)
-        if len(self.command_log)>5: self.command_log.pop()
-        self.command_log_display.setText("\n".join(self.command_log))
+        self.command_log.appendleft(entry); self._log_dirty=True
     def on_result(self,success,duration,wavelength):
         if self.aborted: return
         if success:
-            self.success_count+=1; self.total_time+=duration; self.success_wavelengths.append(wavelength)
+            self.success_count+=1; self.total_time+=duration
         else:
-            self.fail_count+=1; self.failed_wavelengths.append(wavelength)
-        self.durations.append(duration); self.wavelengths.append(wavelength)
+            self.fail_count+=1
+        self.total_duration+=duration
+        if self.wavelength_tested: self.wavelength_tested(wavelength,success)
+        self._stats_dirty=True
+    def _apply_updates(self):
+        """Once per UpdateBus batch: repaint what the batch's events changed."""
+        if self._log_dirty:
+            self._log_dirty=False; self.command_log_display.setText("\n".join(self.command_log))
+        if not self._stats_dirty: return
+        self._stats_dirty=False
+        self._refresh_stats(); self._update_chart(); self._update_eta(); self._show_time()
+    def _refresh_stats(self):
         attempts_done=self.success_count+self.fail_count
         self.attempts_label.setText(f"Attempts: {attempts_done}")
-        if self.wavelength_tested: self.wavelength_tested(wavelength,success)
         self.success_label.setText(f"Success: {self.success_count}")
         self.fail_label.setText(f"Failed: {self.fail_count}")
         avg=self.total_time/self.success_count if self.success_count else 0.0
         self.avg_label.setText(f"Avg: {avg:.1f}s")
         rate=(self.success_count/attempts_done*100) if attempts_done else 0
         self.rate_label.setText(f"Rate: {rate:.1f}%")
-        self._update_chart(); self._update_eta(); self._update_timer()
+    def on_run_estimate(self,seconds,low,high):
+        if self.aborted: return
+        self.run_estimate=(seconds,low,high); self._update_eta()
+    def on_qualified(self,decision,attempts,saved):
+        if self.aborted: return
+        self.qualification=(decision,attempts,saved)
+        self.on_command_sent(f"Qualification {decision.upper()} after {attempts} attempts"
+                             f" (~{self._fmt_span(saved)} bench time saved)")
+    def on_link_state(self,online):
+        if self.aborted or not (self.worker and self.worker.isRunning()): return
+        if online: self._set_status(self._status_before_link)
+        else: self._status_before_link=self.status_pill.text(); self._set_status("Reconnecting")
+        self.on_command_sent("Connection restored" if online else "Connection lost, waiting for device")
+    def on_retest_progress(self,current,total):
+        if self.aborted: return
+        # progress ticks are coalesced by the update bus, so the first one seen may be well past 1
+        if self.progress_bar.maximum()!=total or self.status_pill.text()!="Re-testing":
+            self._set_status("Re-testing"); self.progress_bar.setMaximum(total)
+            self.progress_bar.setVisible(True); self.progress_info_label.setVisible(True)
+        self.progress_bar.setValue(current); self.progress_info_label.setText(f"Re-test {current} / {total}")
+    def on_retest_finished(self,regions):
+        if self.aborted: return
+        self.retest_regions=regions
+        if not regions: return
+        systematic=sum(r['classification']=="systematic" for r in regions)
+        self.on_command_sent(f"Re-test: {systematic} systematic, {len(regions)-systematic} intermittent region(s)")
+    def on_coverage(self,fraction):
+        if self.aborted: return
+        self.coverage_label.setText(f"Coverage: {fraction*100:.1f}%")
     def on_progress(self,current,total):
         if self.aborted: return
         if total>0:
@@ -700,44 +790,40 @@ class ChannelPanel(QFrame):
         self.power_curve_data=data; self._finalize_complete()
     def _finalize_complete(self):
         if self.aborted: return
-        self._set_status("Completed")
+        self._set_status(f"Qualified {self.qualification[0].upper()}" if self.qualification else "Completed")
         if self.timer.isActive(): self.timer.stop()
         self.progress_bar.setVisible(False); self.progress_info_label.setVisible(False)
         self.is_test_completed=True; self.report_btn.setEnabled(True); self.export_btn.setEnabled(True)
         self.start_btn.setEnabled(True); self.latest_eta="0s"; self._update_timer()
         self.needs_reset_next_start=True
     def on_open_logs(self):
-        if os.path.exists(LOG_BASE):
-            try: os.startfile(LOG_BASE)
+        if os.path.exists(cronus_engine.LOG_BASE):
+            try: os.startfile(cronus_engine.LOG_BASE)
             except Exception: pass
     def on_export_data(self):
-        if not (self.worker and self.worker.test_results): return
+        if not (self.worker and self.worker.results): return
         ts=datetime.now().strftime("%Y%m%d_%H%M%S")
         default_name=f"Ch{self.channel}_TestResults_{ts}.csv"
         filename,_=QFileDialog.getSaveFileName(self,"Export Test Data",
-                                               os.path.join(LOG_BASE,default_name),
+                                               os.path.join(cronus_engine.LOG_BASE,default_name),
                                                "CSV Files (*.csv);;All Files (*)")
         if not filename: return
         try:
-            with open(filename,"w",newline='',encoding="utf-8") as f:
-                w=csv.writer(f)
-                w.writerow(["Timestamp","Wavelength (nm)","Success","Duration (s)"])
-                for r in self.worker.test_results:
-                    w.writerow([
-                        r["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
-                        f"{r['wavelength']:.1f}",
-                        "Yes" if r['wl_success'] else "No",
-                        f"{r['wl_duration']:.2f}"
-                    ])
+            write_results_csv(filename,self.worker.results)
             self._set_status("Completed")
         except Exception:
             self._set_status("Error")
     def on_generate_report(self):
-        if not self.is_test_completed or not (self.worker and self.worker.test_results): return
+        if not self.is_test_completed or not (self.worker and self.worker.results): return
         ts=datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename=os.path.join(LOG_BASE,f"Ch{self.channel}_Report_{ts}.pdf")
+        filename=os.path.join(cronus_engine.LOG_BASE,f"Ch{self.channel}_Report_{ts}.pdf")
         self._create_pdf_report(filename)
     def _create_pdf_report(self,filename):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
         doc=SimpleDocTemplate(filename,pagesize=letter)
         styles=getSampleStyleSheet(); story=[]
         title_style=ParagraphStyle('Title',parent=styles['Heading1'],fontSize=20,
@@ -754,6 +840,10 @@ class ChannelPanel(QFrame):
             ["Success Rate",f"{(self.success_count/total_tests*100):.1f}%" if total_tests else "0%"],
             ["Average Duration",f"{(self.total_time/self.success_count):.1f}s" if self.success_count else "N/A"],
         ]
+        if self.qualification:
+            decision,attempts,saved=self.qualification
+            summary_data.append(["Qualification",f"{decision.upper()} after {attempts} attempts "
+                                                  f"({self._fmt_span(saved)} saved)"])
         table=Table(summary_data)
         table.setStyle(TableStyle([
             ('BACKGROUND',(0,0),(-1,0),colors.HexColor('#34495e')),
@@ -766,15 +856,14 @@ class ChannelPanel(QFrame):
         ]))
         story.append(Paragraph("Summary",styles['Heading2']))
         story.append(table); story.append(Spacer(1,16))
-        failed=[r for r in self.worker.test_results if not r['wl_success']]
-        if failed:
+        if self.worker.results.fail_count:
             story.append(Paragraph("Failed Wavelengths",styles['Heading2']))
             failed_rows=[["Timestamp","Wavelength (nm)","Duration (s)"]]
-            for r in failed:
+            for ts,wl,_,duration in self.worker.results.rows(success=False):
                 failed_rows.append([
-                    r['timestamp'].strftime("%H:%M:%S"),
-                    f"{r['wavelength']:.1f}",
-                    f"{r['wl_duration']:.1f}"
+                    ts.strftime("%H:%M:%S"),
+                    f"{wl:.1f}",
+                    f"{duration:.1f}"
                 ])
             ft=Table(failed_rows)
             ft.setStyle(TableStyle([
@@ -784,8 +873,24 @@ class ChannelPanel(QFrame):
                 ('GRID',(0,0),(-1,-1),0.4,colors.HexColor('#d3dce6'))
             ]))
             story.append(ft); story.append(Spacer(1,12))
+        if self.retest_regions:
+            story.append(Paragraph("Failure Re-test",styles['Heading2']))
+            region_rows=[["Region (nm)","Failures","Re-test Fail Rate","Edge Fail Rate","Classification"]]
+            for r in self.retest_regions:
+                region_rows.append([f"{r['lo']:.1f} – {r['hi']:.1f}",str(len(r['failed'])),
+                                    f"{r['fail_rate']*100:.0f}%",f"{r['edge_fail_rate']*100:.0f}%",
+                                    r['classification'].capitalize()])
+            rt=Table(region_rows)
+            rt.setStyle(TableStyle([
+                ('BACKGROUND',(0,0),(-1,0),colors.HexColor('#95a5a6')),
+                ('TEXTCOLOR',(0,0),(-1,0),colors.white),
+                ('ALIGN',(0,0),(-1,-1),'CENTER'),
+                ('GRID',(0,0),(-1,-1),0.4,colors.HexColor('#d3dce6'))
+            ]))
+            story.append(rt); story.append(Spacer(1,12))
         if self.power_curve_data:
             story.append(Paragraph("Power Curve",styles['Heading2']))
+            Figure=_matplotlib()
             fig=Figure(figsize=(7,4.5)); ax=fig.add_subplot(111)
             wls=[p['wavelength'] for p in self.power_curve_data]
             pows=[p['power'] for p in self.power_curve_data]
@@ -928,13 +1033,67 @@ class SettingsDialog(QDialog):
         wait_in=QLineEdit(f"{params['wait_time']}"); wait_in.setFixedWidth(80)
         cyc_in=QSpinBox(); cyc_in.setRange(0,10000000)
         cyc_in.setValue(params['cycles'] if params['cycles'] is not None else 0)
+        dwell_combo=QComboBox(); dwell_combo.addItem("Fixed (wait + 3 s)","fixed")
+        dwell_combo.addItem("Until ready (wait is cap)","ready")
+        dwell_combo.setCurrentIndex(max(0,dwell_combo.findData(params.get("dwell_mode","fixed"))))
         row2.addWidget(QLabel("Post-set Wait (s):")); row2.addWidget(wait_in)
+        row2.addWidget(QLabel("Dwell:")); row2.addWidget(dwell_combo)
         row2.addWidget(QLabel("Cycles (0=∞):")); row2.addWidget(cyc_in)
         pc_box=QCheckBox("Measure power curve after test"); pc_box.setChecked(params["measure_power_curve"])
         self._style_checkbox(pc_box)
+        ps_box=QCheckBox("Ready requires stable power"); ps_box.setChecked(params.get("power_stability",False))
+        self._style_checkbox(ps_box)
+        ps_box.setEnabled(dwell_combo.currentData()=="ready")
+        dwell_combo.currentIndexChanged.connect(lambda _,c=dwell_combo,b=ps_box: b.setEnabled(c.currentData()=="ready"))
+        row3=QHBoxLayout()
+        seq_combo=QComboBox()
+        for label,key in (("Random","random"),("Low-discrepancy (Halton)","halton"),
+                          ("Stratified by zone","stratified"),("Shuffled grid (no repeats)","shuffled")):
+            seq_combo.addItem(label,key)
+        seq_combo.setCurrentIndex(max(0,seq_combo.findData(params.get("sequence","random"))))
+        jump_combo=QComboBox()
+        for label,key in (("As generated","none"),("Minimize travel","min_travel"),
+                          ("Maximize jumps (stress)","max_jump"),("Target jump size","target")):
+            jump_combo.addItem(label,key)
+        jump_combo.setCurrentIndex(max(0,jump_combo.findData(params.get("jump_profile","none"))))
+        jump_in=QLineEdit(f"{params.get('target_jump',50.0)}"); jump_in.setFixedWidth(60)
+        jump_in.setEnabled(jump_combo.currentData()=="target")
+        jump_combo.currentIndexChanged.connect(lambda _,c=jump_combo,e=jump_in: e.setEnabled(c.currentData()=="target"))
+        row3.addWidget(QLabel("Wavelength order:")); row3.addWidget(seq_combo)
+        row3.addWidget(QLabel("Jumps:")); row3.addWidget(jump_combo)
+        row3.addWidget(QLabel("Target (nm):")); row3.addWidget(jump_in); row3.addStretch()
+        row4=QHBoxLayout()
+        qual_box=QCheckBox("Qualification mode (stop once pass/fail is settled)")
+        qual_box.setChecked(params.get("qualification",False)); self._style_checkbox(qual_box)
+        qual_spins=[]
+        for key,label,lo,hi,default in (("spec_rate","Spec (%):",1.0,100.0,95.0),("qual_margin","±",0.01,50.0,3.0),
+                                        ("qual_confidence","Confidence (%):",80.0,99.99,95.0)):
+            spin=QDoubleSpinBox(); spin.setRange(lo,hi); spin.setDecimals(2); spin.setValue(params.get(key,default))
+            spin.setEnabled(qual_box.isChecked()); qual_spins.append(spin)
+            row4.addWidget(QLabel(label)); row4.addWidget(spin)
+        qual_box.toggled.connect(lambda on,sp=qual_spins: [w.setEnabled(on) for w in sp])
+        row4.addStretch()
         g._dev_label=dev_label; g._min_input=self_min; g._max_input=self_max
         g._wait_input=wait_in; g._cycles_input=cyc_in; g._pc_box=pc_box; g._channel=ch
-        g_layout.addLayout(row1); g_layout.addLayout(row2); g_layout.addWidget(pc_box)
+        g._dwell_combo=dwell_combo; g._ps_box=ps_box; g._seq_combo=seq_combo
+        g._jump_combo=jump_combo; g._jump_input=jump_in; g._qual_box=qual_box; g._qual_spins=qual_spins
+        g_layout.addLayout(row1); g_layout.addLayout(row2); g_layout.addLayout(row3)
+        g_layout.addWidget(pc_box); g_layout.addWidget(ps_box)
+        g_layout.addWidget(qual_box); g_layout.addLayout(row4)
+        row5=QHBoxLayout()
+        retest_box=QCheckBox("Re-test failure regions after the run"); self._style_checkbox(retest_box)
+        retest_box.setChecked(params.get("retest",False))
+        rep_in=QSpinBox(); rep_in.setRange(1,100); rep_in.setValue(params.get("retest_repeats",3))
+        rad_in=QDoubleSpinBox(); rad_in.setRange(0.0,50.0); rad_in.setDecimals(1); rad_in.setSingleStep(0.1)
+        rad_in.setValue(params.get("retest_radius",0.5))
+        for w in (rep_in,rad_in): w.setEnabled(retest_box.isChecked())
+        retest_box.toggled.connect(lambda on,ws=(rep_in,rad_in): [w.setEnabled(on) for w in ws])
+        row5.addWidget(retest_box); row5.addWidget(QLabel("Repeats:")); row5.addWidget(rep_in)
+        row5.addWidget(QLabel("Neighborhood (nm):")); row5.addWidget(rad_in); row5.addStretch()
+        g_layout.addLayout(row5)
+        abort_box=QCheckBox("Abort tuning on the device when stopped"); self._style_checkbox(abort_box)
+        abort_box.setChecked(params.get("abort_on_stop",False)); g_layout.addWidget(abort_box); g._abort_box=abort_box
+        g._retest_box=retest_box; g._retest_repeats=rep_in; g._retest_radius=rad_in
         return g
     def _read_range(self,channel,dev_label:QLabel):
         dmin,dmax=fetch_device_range(channel)
@@ -974,12 +1133,31 @@ class SettingsDialog(QDialog):
         except:
             wait_time=current_params.get("wait_time",3.0); messages.append(f"Channel {ch}: Invalid post-set wait -> {wait_time}")
         cycles=group._cycles_input.value(); power_curve=group._pc_box.isChecked()
+        try:
+            target_jump=float(group._jump_input.text())
+            if target_jump<0: messages.append(f"Channel {ch}: Negative target jump -> 0"); target_jump=0.0
+        except:
+            target_jump=current_params.get("target_jump",50.0); messages.append(f"Channel {ch}: Invalid target jump -> {target_jump}")
         return {
             "test_min": user_min,
             "test_max": user_max,
             "wait_time": wait_time,
             "cycles": cycles,
-            "measure_power_curve": power_curve
+            "measure_power_curve": power_curve,
+            "dwell_mode": group._dwell_combo.currentData(),
+            "power_stability": group._ps_box.isChecked(),
+            "sequence": group._seq_combo.currentData(),
+            "jump_profile": group._jump_combo.currentData(),
+            "target_jump": target_jump,
+            "qualification": group._qual_box.isChecked(),
+            "spec_rate": group._qual_spins[0].value(),
+            "qual_margin": group._qual_spins[1].value(),
+            "qual_confidence": group._qual_spins[2].value(),
+            "retest": group._retest_box.isChecked(),
+            "retest_repeats": group._retest_repeats.value(),
+            "retest_radius": group._retest_radius.value(),
+            "abort_on_stop": group._abort_box.isChecked(),
+            "abort_path": current_params.get("abort_path","/Ch{channel}/Abort")
         }, messages
     def _on_apply(self):
         self.show_map=self.map_checkbox.isChecked()
@@ -1089,25 +1267,51 @@ class MainWindow(QWidget):
         self.setWindowTitle("Cronus Training App")
         self.setMinimumSize(1300,800)
         self.config=load_config()
-        self.device_ranges={1:fetch_device_range(1),2:fetch_device_range(2)}
-        self._initialize_channel_params(self.config['ch1'],self.device_ranges[1])
-        self._initialize_channel_params(self.config['ch2'],self.device_ranges[2])
+        self.device_ranges={1:(None,None),2:(None,None)}
         self.show_map=True
         self.show_zones=self.config.get("show_zones",False)
         self.zones_cfg=self.config.get("zones",[])
         self.cronus_apps=self.config.get("cronus_apps",[])
         self.cronus_default_index=self.config.get("cronus_app_default",-1)
-        self._map_bars=[]
         self._apply_theme()
         self.wavelength_map_data={}
         self._setup_ui()
-        if (self.device_ranges[1][0] is None or self.device_ranges[2][0] is None):
+        self.update_wavelength_map()
+        self.ch1_panel._set_status("Reading Range"); self.ch2_panel._set_status("Reading Range")
+        self.range_fetcher=RangeFetcher((1,2))
+        self.range_fetcher.range_fetched.connect(self.on_range_fetched)
+        self.range_fetcher.finished.connect(self.on_ranges_fetched)
+        self.range_fetcher.start()
+        self.status_bridge=StatusBridge()
+        self.status_bridge.status_update.connect(self.on_status_update)
+        STATUS_CACHE.subscribe(self.status_bridge); STATUS_CACHE.link.subscribe(self.status_bridge.on_link)
+        STATUS_CACHE.start_polling(("/Status","/Mode"))
+    def on_range_fetched(self,channel,rng):
+        panel=self.ch1_panel if channel==1 else self.ch2_panel
+        if rng[0] is not None and rng[1] is not None:
+            self.device_ranges[channel]=rng
+            self._initialize_channel_params(self.get_channel_params(channel),rng)
+        panel.refresh_param_summary()
+        if not (panel.worker and panel.worker.isRunning()):
+            panel._set_status("Standby" if panel.device_min is not None else "Range Unknown")
+    def on_ranges_fetched(self):
+        self.offer_resume()
+        if self.device_ranges[1][0] is None or self.device_ranges[2][0] is None:
             QTimer.singleShot(300,self.open_settings)
-        self.status_worker=StatusWorker()
-        self.status_worker.status_update.connect(self.on_status_update)
-        self.status_worker.start()
-        self.map_dragging=False
-        self._connect_map_events()
+    def offer_resume(self):
+        for ch,panel in ((1,self.ch1_panel),(2,self.ch2_panel)):
+            state=find_resumable_journal(ch)
+            if state is None or self.device_ranges[ch][0] is None: continue
+            started=state.started.strftime("%Y-%m-%d %H:%M") if state.started else "an earlier session"
+            answer=QMessageBox.question(self,"Resume Interrupted Run",
+                f"Channel {ch} has an unfinished run from {started} with {len(state.results)} attempts.\n"
+                "Resume it?")
+            if answer!=QMessageBox.StandardButton.Yes:
+                discard_journal(state); continue
+            panel.resume_run(state)
+            for _,wl,ok,_ in state.results.rows():
+                self.wavelength_map_data[round(wl,1)]='success' if ok else 'failed'
+            self.update_wavelength_map()
     def _initialize_channel_params(self,ch_params:dict,device_range:tuple):
         dmin,dmax=device_range
         if dmin is None or dmax is None: return
@@ -1118,8 +1322,13 @@ class MainWindow(QWidget):
         if ch_params["test_min"]>=ch_params["test_max"]:
             ch_params["test_min"],ch_params["test_max"]=dmin,dmax
     def closeEvent(self,event):
-        if hasattr(self,'status_worker'):
-            self.status_worker.stop(); self.status_worker.wait()
+        if hasattr(self,'status_bridge'):
+            STATUS_CACHE.unsubscribe(self.status_bridge); STATUS_CACHE.link.unsubscribe(self.status_bridge.on_link)
+            STATUS_CACHE.stop_polling(); STATUS_CACHE.link.shutdown()
+        if hasattr(self,'range_fetcher'): self.range_fetcher.wait()
+        ENGINE.shutdown()
+        LOG_WRITER.shutdown()
+        TRANSPORT.close()
         event.accept()
     def _apply_theme(self):
         self.setStyleSheet("""
@@ -1185,14 +1394,12 @@ class MainWindow(QWidget):
         map_reset=QPushButton("Reset Map"); map_reset.setStyleSheet(self._header_button_style())
         map_reset.clicked.connect(self.on_reset_wavelength_map); map_head.addWidget(map_reset)
         map_layout.addLayout(map_head)
-        self.map_fig,self.map_ax=plt.subplots(figsize=(10,2.6))
-        self.map_canvas=FigureCanvas(self.map_fig); self.update_wavelength_map()
-        map_layout.addWidget(self.map_canvas)
+        self.map_view=WavelengthMapWidget(self.wavelength_map_data); map_layout.addWidget(self.map_view)
         layout.addWidget(self.map_frame); self.map_frame.setVisible(self.show_map)
         scroll=QScrollArea(); scroll.setWidgetResizable(True)
         inner=QWidget(); ch_l=QHBoxLayout(inner); ch_l.addStretch()
-        self.ch1_panel=ChannelPanel(1,self.get_channel_params,self.get_device_range)
-        self.ch2_panel=ChannelPanel(2,self.get_channel_params,self.get_device_range)
+        self.ch1_panel=ChannelPanel(1,self.get_channel_params,self.get_device_range,self.get_zone_bounds)
+        self.ch2_panel=ChannelPanel(2,self.get_channel_params,self.get_device_range,self.get_zone_bounds)
         self.ch1_panel.wavelength_tested=self.on_wavelength_tested
         self.ch2_panel.wavelength_tested=self.on_wavelength_tested
         ch_l.addWidget(self.ch1_panel); ch_l.addSpacing(32); ch_l.addWidget(self.ch2_panel); ch_l.addStretch()
@@ -1235,6 +1442,7 @@ class MainWindow(QWidget):
             self._populate_cronus_combo()
     def get_channel_params(self,ch): return self.config['ch1'] if ch==1 else self.config['ch2']
     def get_device_range(self,ch): return self.device_ranges.get(ch,(None,None))
+    def get_zone_bounds(self): return cronus_engine.zone_bounds(self.zones_cfg)
     def on_status_update(self,connected,mode):
         if connected:
             self.connection_indicator.setStyleSheet("color:#22c55e;font-size:16px;")
@@ -1244,14 +1452,13 @@ class MainWindow(QWidget):
             self.connection_status.setText("Disconnected"); self.shutdown_btn.setEnabled(False)
         self.mode_label.setText(f"Mode: {mode}")
     def on_shutdown_cronus(self):
-        result=safe_put_json(f"{API_BASE}/Off",{})
+        result=TRANSPORT.put_json("/Off",{})
         if result and result.get("OK"):
             self.connection_status.setText("Shutting down...")
             self.connection_indicator.setStyleSheet("color:#f39c12;font-size:16px;")
     def on_reconnect(self):
         refreshed=False
-        for ch in (1,2):
-            rng=fetch_device_range(ch)
+        for ch,rng in fetch_device_ranges((1,2)).items():
             if rng[0] is not None and rng[1] is not None:
                 self.device_ranges[ch]=rng; refreshed=True
         if refreshed:
@@ -1259,7 +1466,7 @@ class MainWindow(QWidget):
             self._initialize_channel_params(self.config['ch2'],self.device_ranges[2])
             self.ch1_panel.refresh_param_summary(); self.ch2_panel.refresh_param_summary()
             save_config(self.config)
-        status_response=safe_get_json(f"{API_BASE}/Status")
+        status_response=STATUS_CACHE.get("/Status")
         connected=status_response is not None and status_response.get("OK",False)
         self.on_status_update(connected,status_response.get("Mode","Unknown") if connected else "Unknown")
         if refreshed and connected:
@@ -1299,19 +1506,35 @@ class MainWindow(QWidget):
         except Exception as e:
             QMessageBox.warning(self,"Launch Cronus App",f"Failed to launch:\n{e}")
     def on_wavelength_tested(self,wl,success):
-        self.wavelength_map_data[wl]='success' if success else 'failed'
-        self.update_wavelength_map()
+        status='success' if success else 'failed'
+        prev=self.wavelength_map_data.get(wl)
+        if prev==status: return
+        self.wavelength_map_data[wl]=status
+        if self.map_view.add(wl,status,prev): self._update_map_rate()
+        else: self.update_wavelength_map()
     def on_reset_wavelength_map(self):
         self.wavelength_map_data.clear(); self.update_wavelength_map()
-    def _connect_map_events(self):
-        self.map_fig.canvas.mpl_connect("button_press_event",self._on_map_press)
-        self.map_fig.canvas.mpl_connect("button_release_event",self._on_map_release)
-        self.map_fig.canvas.mpl_connect("motion_notify_event",self._on_map_motion)
+    def _update_map_rate(self):
+        total=len(self.wavelength_map_data)
+        if not total:
+            self.map_success_label.setText("")
+            self.map_success_label.setStyleSheet("font-size:13px;font-weight:600;color:#334155;"
+                                                 "background:#e2e8f0;padding:4px 10px;border-radius:14px;")
+            return
+        rate=self.map_view.success/total*100
+        self.map_success_label.setText(f"{rate:.1f}% Success")
+        if rate>95:
+            pill_bg="#dcfce7"; pill_fg="#166534"; border="#16a34a"
+        elif rate>=80:
+            pill_bg="#fef9c3"; pill_fg="#854d0e"; border="#f59e0b"
+        else:
+            pill_bg="#fee2e2"; pill_fg="#7f1d1d"; border="#ef4444"
+        self.map_success_label.setStyleSheet(
+            f"font-size:13px;font-weight:600;color:{pill_fg};background:{pill_bg};"
+            f"padding:4px 12px;border-radius:16px;border:1px solid {border};"
+        )
     def update_wavelength_map(self):
-        if not hasattr(self,'_map_bars'): self._map_bars=[]
-        ax=self.map_ax; ax.clear()
-        bg_color='white'; text_color='#1e293b'; grid_color='#cbd5e1'
-        data=self.wavelength_map_data; self._map_bars.clear()
+        data=self.wavelength_map_data
         enabled_zones=[]
         for i,z in enumerate(self.zones_cfg):
             if i>=len(BASE_ZONE_DEFS): break
@@ -1337,80 +1560,11 @@ class MainWindow(QWidget):
         else:
             x_min_display=min(data_min,zone_min) if self.show_zones else data_min
             x_max_display=max(data_max,zone_max) if self.show_zones else data_max
-        if self.show_zones:
-            for z in enabled_zones:
-                ax.axvspan(z['min'],z['max'],ymin=0,ymax=1,facecolor=z['color'],alpha=0.22,zorder=0)
-                mid=(z['min']+z['max'])/2
-                ax.text(mid,1.02,z['label'],ha='center',va='bottom',fontsize=9,color='#334155',
-                        fontweight='600',clip_on=False,alpha=0.9)
-        if not data:
-            ax.text(0.5,0.5,"No wavelengths tested yet",ha='center',va='center',fontsize=12,
-                    color='#64748b',transform=ax.transAxes)
-            self.map_success_label.setText("")
-            self.map_success_label.setStyleSheet("font-size:13px;font-weight:600;color:#334155;"
-                                                 "background:#e2e8f0;padding:4px 10px;border-radius:14px;")
-        else:
-            success_wls=[wl for wl,st in data.items() if st=='success']
-            fail_wls=[wl for wl,st in data.items() if st=='failed']
-            total=len(data); succ=len(success_wls); rate=(succ/total*100) if total else 0
-            self.map_success_label.setText(f"{rate:.1f}% Success")
-            if rate>95:
-                pill_bg="#dcfce7"; pill_fg="#166534"; border="#16a34a"
-            elif rate>=80:
-                pill_bg="#fef9c3"; pill_fg="#854d0e"; border="#f59e0b"
-            else:
-                pill_bg="#fee2e2"; pill_fg="#7f1d1d"; border="#ef4444"
-            self.map_success_label.setStyleSheet(
-                f"font-size:13px;font-weight:600;color:{pill_fg};background:{pill_bg};"
-                f"padding:4px 12px;border-radius:16px;border:1px solid {border};"
-            )
-            span=x_max_display - x_min_display if x_max_display>x_min_display else 100
-            bar_w=max(0.5,min(span*0.015,5))
-            if fail_wls:
-                bf=ax.bar(fail_wls,[0.4]*len(fail_wls),width=bar_w,bottom=0,
-                          color='#ef4444',edgecolor='#dc2626',linewidth=1.2,label='Failed',picker=True,zorder=5)
-                for b,wl in zip(bf,fail_wls): self._map_bars.append((b,wl,'Failed'))
-            if success_wls:
-                bs=ax.bar(success_wls,[0.4]*len(success_wls),width=bar_w,bottom=0.5,
-                          color='#22c55e',edgecolor='#16a34a',linewidth=1.2,label='Success',picker=True,zorder=5)
-                for b,wl in zip(bs,success_wls): self._map_bars.append((b,wl,'Success'))
-        final_span=x_max_display - x_min_display if x_max_display>x_min_display else 100
-        pad=max(final_span*0.05,10)
-        ax.set_xlim(x_min_display - pad, x_max_display + pad); ax.set_ylim(0,1)
-        ax.set_xlabel("Wavelength (nm)",fontsize=11,fontweight='600',color=text_color)
-        ax.set_yticks([])
-        for side in ['top','right','left']: ax.spines[side].set_visible(False)
-        ax.spines['bottom'].set_color(grid_color); ax.spines['bottom'].set_linewidth(1.4)
-        ax.tick_params(axis='x',colors=text_color,labelsize=9)
-        ax.grid(True,axis='x',linestyle='--',alpha=0.18,color=grid_color); ax.set_facecolor(bg_color)
-        if data:
-            legend=self.map_fig.legend(loc='lower center',ncol=2,framealpha=0.98,
-                                       facecolor=bg_color,edgecolor=grid_color,
-                                       bbox_to_anchor=(0.5,-0.18),fontsize=10,
-                                       borderpad=1,labelspacing=0.8,handlelength=2)
-            for txt in legend.get_texts():
-                txt.set_color(text_color); txt.set_fontweight('600')
-        else:
-            if self.map_fig.legends:
-                for L in self.map_fig.legends: L.remove()
-        self.map_fig.subplots_adjust(bottom=0.30); self.map_canvas.draw()
-    def _on_map_press(self,event):
-        if event.inaxes==self.map_ax and event.button==1: self.map_dragging=True
-    def _on_map_release(self,event):
-        self.map_dragging=False; QToolTip.hideText()
-    def _on_map_motion(self,event):
-        if not self.map_dragging: return
-        if event.inaxes!=self.map_ax or event.xdata is None or event.ydata is None:
-            QToolTip.hideText(); return
-        for bar,wl,status in self._map_bars:
-            bx=bar.get_x(); bw=bar.get_width(); by=bar.get_y(); bh=bar.get_height()
-            if bx<=event.xdata<=bx+bw and by<=event.ydata<=by+bh:
-                text=f"{wl:.1f} nm - {'✓' if status=='Success' else '✗'} {status}"
-                global_pos=self.map_canvas.mapToGlobal(
-                    QPoint(int(event.guiEvent.position().x()),int(event.guiEvent.position().y())))
-                QToolTip.showText(global_pos+QPoint(12,12),text,self.map_canvas,msecShowTime=1200)
-                return
-        QToolTip.hideText()
+        span=x_max_display - x_min_display if x_max_display>x_min_display else 100
+        pad=max(span*0.05,10)
+        zones=[(z['label'],z['min'],z['max'],z['color']) for z in enabled_zones] if self.show_zones else []
+        self.map_view.set_view(x_min_display-pad,x_max_display+pad,max(0.5,min(span*0.015,5)),zones)
+        self._update_map_rate()
 
 def main():
     app=QApplication(sys.argv)
@@ -0,0 +1,433 @@
+"""Engine tests: python -m unittest (or pytest) from the repository root.
+
+Device-facing tests run against an in-process cronus_sim server, so no
+hardware or network is needed.
+"""
+import os
+import json
+import math
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+import cronus_engine as ce
+import cronus_sim
+import cronus_cli
+import cronus_fleet
+
+class QualificationTestTests(unittest.TestCase):
+    def test_bounds_match_wald(self):
+        q = ce.QualificationTest(95.0, 3.0, 95.0)
+        self.assertAlmostEqual(q.fail_bound, math.log(0.95 / 0.05))
+        self.assertAlmostEqual(q.pass_bound, math.log(0.05 / 0.95))
+
+    def test_rejects_degenerate_confidence(self):
+        for confidence in (100.0, 50.0, 0.0, 120.0, -5.0):
+            with self.assertRaises(ValueError):
+                ce.QualificationTest(95.0, 3.0, confidence)
+
+    def test_decides_pass_and_fail(self):
+        good = ce.QualificationTest(95.0, 3.0, 95.0)
+        decision = None
+        for _ in range(500):
+            decision = good.update(True)
+            if decision:
+                break
+        self.assertEqual(decision, "pass")
+        bad = ce.QualificationTest(95.0, 3.0, 95.0)
+        decision = None
+        for _ in range(500):
+            decision = bad.update(False)
+            if decision:
+                break
+        self.assertEqual(decision, "fail")
+        self.assertLess(bad.attempts, good.attempts)
+
+    def test_decision_is_final(self):
+        q = ce.QualificationTest(95.0, 3.0, 95.0)
+        while not q.update(False):
+            pass
+        attempts = q.attempts
+        self.assertEqual(q.update(True), "fail")
+        self.assertEqual(q.attempts, attempts)
+
+class MergeChannelTests(unittest.TestCase):
+    def test_clamps_qualification_and_retest(self):
+        p = ce.merge_channel({"qual_confidence": 100, "spec_rate": 0, "qual_margin": -1,
+                              "retest_repeats": 0, "retest_radius": -3})
+        self.assertEqual(p["qual_confidence"], 99.99)
+        self.assertEqual(p["spec_rate"], 1.0)
+        self.assertEqual(p["qual_margin"], 0.01)
+        self.assertEqual(p["retest_repeats"], 1)
+        self.assertEqual(p["retest_radius"], 0.0)
+        ce.QualificationTest(p["spec_rate"], p["qual_margin"], p["qual_confidence"])
+        self.assertEqual(ce.merge_channel({"qual_confidence": 50})["qual_confidence"], 80.0)
+
+    def test_cli_overrides_are_clamped(self):
+        args = cronus_cli.build_parser().parse_args(
+            ["--qualify", "--qual-confidence", "100", "--retest", "--retest-repeats", "0", "--retest-radius", "-3"])
+        p = cronus_cli._resolve_params({"ch1": ce.merge_channel({})}, 1, args)
+        self.assertTrue(p["qualification"])
+        self.assertEqual(p["qual_confidence"], 99.99)
+        self.assertEqual(p["retest_repeats"], 1)
+        self.assertEqual(p["retest_radius"], 0.0)
+        ce.QualificationTest(p["spec_rate"], p["qual_margin"], p["qual_confidence"])
+
+    def test_fleet_and_cli_apply_the_same_overrides(self):
+        argv = ["--cycles", "20", "--qualify", "--qual-confidence", "100", "--retest-repeats", "0", "--no-power-curve"]
+        cfg = {"ch1": {"spec_rate": 0, "wait_time": 2.0}}
+        device = cronus_fleet.FleetDevice("bench", "http://127.0.0.1:1/v0/Cronus")
+        try:
+            self.assertEqual(device.params(cfg, 1, cronus_fleet.build_parser().parse_args(argv)),
+                             cronus_cli._resolve_params(cfg, 1, cronus_cli.build_parser().parse_args(argv)))
+        finally:
+            device.transport.close()
+
+class VerdictTests(unittest.TestCase):
+    def _run(self, successes, attempts, end_reason="completed", qualification=None):
+        results = ce.ResultStore()
+        for i in range(attempts):
+            results.append(700.0 + i, i < successes, 1.0)
+        return types.SimpleNamespace(results=results, end_reason=end_reason, qualification=qualification,
+                                     params=ce.merge_channel({"spec_rate": 95.0}))
+
+    def test_undecided_qualification_is_judged_against_the_spec(self):
+        undecided = ce.QualificationTest(95.0, 3.0, 95.0)
+        passed, verdict = cronus_cli.channel_verdict(self._run(29, 30, qualification=undecided), 100.0)
+        self.assertTrue(passed)
+        self.assertIn("undecided", verdict)
+        self.assertFalse(cronus_cli.channel_verdict(self._run(27, 30, qualification=undecided), 100.0)[0])
+
+    def test_unfinished_runs_never_pass(self):
+        for end_reason, verdict in (("stopped", "INTERRUPTED"), (None, "INTERRUPTED"), ("unreachable", "UNREACHABLE")):
+            self.assertEqual(cronus_cli.channel_verdict(self._run(30, 30, end_reason), 100.0), (False, verdict))
+        self.assertEqual(cronus_cli.channel_verdict(self._run(30, 30), 100.0), (True, "PASS"))
+
+class SequenceTests(unittest.TestCase):
+    def test_shuffled_covers_every_point_once(self):
+        seq = ce.make_sequence("shuffled", 700.0, 705.0, rng=random.Random(1))
+        picks = [seq.next() for _ in range(seq.coverage.size)]
+        self.assertEqual(len(set(picks)), seq.coverage.size)
+
+    def test_stratified_keeps_strata_proportional(self):
+        seq = ce.make_sequence("stratified", 700.0, 800.0, [(700.0, 710.0)], rng=random.Random(2))
+        picks = [seq.next() for _ in range(200)]
+        narrow = sum(wl < 710.0 for wl in picks)
+        self.assertAlmostEqual(narrow / len(picks), 0.1, delta=0.02)
+
+    def test_halton_prefix_is_spread(self):
+        seq = ce.make_sequence("halton", 700.0, 800.0, rng=random.Random(3))
+        picks = sorted(seq.next() for _ in range(16))
+        self.assertLess(max(b - a for a, b in zip(picks, picks[1:])), 100.0 / 16 * 2 + 0.2)
+
+    def test_scheduler_never_repeats_within_a_batch(self):
+        for strategy in ("shuffled", "stratified"):
+            seq = ce.make_sequence(strategy, 700.0, 702.0, [(700.5, 701.0)], rng=random.Random(3))
+            sch = ce.JumpScheduler(seq, "min_travel", batch=16)
+            pos = None
+            batches = []
+            for _ in range(48):
+                if not sch.planned:
+                    batches.append([])
+                pos = sch.next(pos)
+                seq.coverage.mark(pos)
+                batches[-1].append(pos)
+            for batch in batches:
+                self.assertEqual(len(batch), len(set(batch)), strategy)
+            self.assertEqual(seq.coverage.fraction, 1.0)
+            self.assertFalse(seq.reserved)
+
+    def test_min_travel_sweeps_one_way(self):
+        seq = ce.make_sequence("random", 700.0, 900.0, rng=random.Random(4))
+        sch = ce.JumpScheduler(seq, "min_travel", batch=32)
+        first = sch.next(None)
+        batch = [first] + [sch.next(first) for _ in range(31)]
+        self.assertIn(batch, (sorted(batch), sorted(batch, reverse=True)))
+
+    def test_merge_failure_regions(self):
+        regions = ce.merge_failure_regions([800.0, 800.4, 801.5, 850.0], 1.0)
+        self.assertEqual([(r["lo"], r["hi"]) for r in regions], [(800.0, 800.4), (801.5, 801.5), (850.0, 850.0)])
+
+class _Api:
+    """Stand-in transport: slow, counted GETs answered from a dict."""
+    def __init__(self, answers, delay=0.0):
+        self.answers = answers
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_json(self, path, timeout=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.answers.get(path)
+
+class TransportTests(unittest.TestCase):
+    def test_sessions_of_exited_threads_are_closed(self):
+        api = ce.CronusTransport(f"http://127.0.0.1:{_free_port()}/v0/Cronus", default_timeout=0.5)
+        try:
+            for _ in range(5):
+                t = threading.Thread(target=api.get_json, args=("/Status",))
+                t.start()
+                t.join()
+            self.assertEqual(len(api._sessions), 1)  # only the last thread's, closed when the next one starts
+            api.get_json("/Status")
+            self.assertEqual(list(api._sessions), [threading.current_thread()])
+        finally:
+            api.close()
+
+class StatusCacheTests(unittest.TestCase):
+    def test_concurrent_reads_share_one_request(self):
+        api = _Api({"/Ch1/Status": {"OK": True}}, delay=0.2)
+        cache = ce.StatusCache(api)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("/Ch1/Status"))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(api.calls, 1)
+        self.assertEqual(results, [{"OK": True}] * 5)
+        self.assertEqual(cache.get("/Ch1/Status", max_age=10.0), {"OK": True})
+        self.assertEqual(api.calls, 1)
+        cache.get("/Ch1/Status")
+        self.assertEqual(api.calls, 2)
+
+    def test_channel_errors_do_not_flip_the_link(self):
+        cache = ce.StatusCache(_Api({"/Status": {"OK": True}}))
+        transitions = []
+        cache.link.subscribe(transitions.append)
+        try:
+            for _ in range(3):
+                self.assertIsNone(cache.get("/Ch1/Status"))
+            self.assertTrue(cache.link.online)
+            cache.api.answers.clear()
+            cache.get("/Status")
+            self.assertFalse(cache.link.online)
+            self.assertEqual(transitions, [False])
+        finally:
+            cache.link.shutdown()
+
+    def test_transport_connection_error_flips_the_link(self):
+        port = _free_port()  # nothing listens there, so connecting is refused
+        api = ce.CronusTransport(f"http://127.0.0.1:{port}/v0/Cronus", default_timeout=0.5)
+        cache = api.status_cache
+        try:
+            self.assertIsNone(api.get_json("/Ch1/Status"))
+            self.assertFalse(cache.link.online)
+        finally:
+            cache.link.shutdown()
+            api.close()
+
+    def test_runs_on_one_transport_share_its_cache(self):
+        api = ce.CronusTransport(f"http://127.0.0.1:{_free_port()}/v0/Cronus")
+        params = ce.merge_channel({})
+        runs = [ce.ChannelRun(ch, params, (680.0, 960.0), api=api) for ch in (1, 2, 1)]
+        self.assertTrue(all(run.status_cache is api.status_cache for run in runs))
+        self.assertEqual(api.link_observers, [api.status_cache.link.report])
+        self.assertIs(ce.ChannelRun(1, params, (680.0, 960.0)).status_cache, ce.STATUS_CACHE)
+
+    def test_link_drop_after_the_prober_exits_starts_a_new_one(self):
+        class _FastMonitor(ce.ConnectionMonitor):
+            BACKOFF_BASE = 0.01
+        class _Cache:
+            def get(self, path, max_age=0.0):
+                link.report(True)
+        link = _FastMonitor(_Cache())
+        try:
+            for _ in range(2):
+                link.report(False)
+                prober = link._prober
+                self.assertIsNotNone(prober)
+                prober.join(2)
+                self.assertTrue(link.online)
+                self.assertIsNone(link._prober)
+        finally:
+            link.shutdown()
+
+    def test_headless_run_gives_up_on_an_unreachable_device(self):
+        api = ce.CronusTransport(f"http://127.0.0.1:{_free_port()}/v0/Cronus", default_timeout=0.5)
+        cache = api.status_cache
+        engine = ce.TestEngine()
+        log_dir, log_base = tempfile.mkdtemp(), ce.LOG_BASE
+        ce.set_log_dir(log_dir)
+        try:
+            run = ce.ChannelRun(1, ce.merge_channel({"cycles": 5, "measure_power_curve": False}), (680.0, 960.0),
+                                api=api, log_dir=log_dir, reconnect_timeout=0.5)
+            self.assertTrue(engine.start(run).wait(10))
+            self.assertEqual(run.end_reason, "unreachable")
+            self.assertEqual(len(run.results), 0)
+        finally:
+            engine.shutdown()
+            ce.LOG_WRITER.flush(5)
+            cache.link.shutdown()
+            api.close()
+            ce.LOG_BASE = log_base
+            shutil.rmtree(log_dir, ignore_errors=True)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class JournalTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.writer = ce.LogWriter()
+
+    def tearDown(self):
+        self.writer.shutdown()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _journal(self, name="Ch1_journal_20260101_000000.jsonl"):
+        journal = ce.RunJournal(os.path.join(self.dir, name), writer=self.writer)
+        journal.write("start", channel=1, params=dict(ce.DEFAULT_PARAMS, cycles=10), device_range=[700.0, 900.0])
+        for wl, ok in ((701.0, True), (702.5, False), (703.0, True)):
+            journal.write("attempt", wavelength=wl, success=ok, duration=1.25)
+        journal.write("retest", lo=702.5, hi=702.5, failed=[702.5], classification="intermittent")
+        return journal
+
+    def test_resume_replays_an_unfinished_run(self):
+        journal = self._journal()
+        journal.close()
+        self.writer.flush()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"type":"attempt","wavelength":7')  # torn by a crash
+        state = ce.find_resumable_journal(1, self.dir)
+        self.assertIsNotNone(state)
+        self.assertEqual(state.channel, 1)
+        self.assertEqual(state.params["cycles"], 10)
+        self.assertEqual(state.device_range, (700.0, 900.0))
+        self.assertEqual([row[1:3] for row in state.results.rows()],
+                         [(701.0, True), (702.5, False), (703.0, True)])
+        self.assertEqual(state.retest_regions[0]["classification"], "intermittent")
+        self.assertFalse(state.finished)
+
+    def test_finished_and_discarded_runs_are_not_resumed(self):
+        journal = self._journal()
+        journal.write("end", reason="completed")
+        journal.close()
+        self.writer.flush()
+        self.assertIsNone(ce.find_resumable_journal(1, self.dir))
+        journal = self._journal("Ch1_journal_20260102_000000.jsonl")
+        journal.close()
+        self.writer.flush()
+        state = ce.find_resumable_journal(1, self.dir)
+        self.assertIsNotNone(state)
+        ce.discard_journal(state)
+        self.assertIsNone(ce.find_resumable_journal(1, self.dir))
+
+class RetestTests(unittest.TestCase):
+    """Runs the re-test phase on a resumed run against the simulator."""
+    @classmethod
+    def setUpClass(cls):
+        config = cronus_sim.load_sim_config(None, {
+            "accel": 1000.0, "p_fail_default": 0.0,
+            "failure_regions": [{"min": 799.0, "max": 801.0, "p_fail": 1.0}]})
+        cls.server = cronus_sim.SimulatorServer(port=0, config=config, seed=5).start()
+        cls.api = ce.CronusTransport(cls.server.url)
+        cls.engine = ce.TestEngine()
+        cls.dir = tempfile.mkdtemp()
+        cls.log_base = ce.LOG_BASE
+        ce.set_log_dir(cls.dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.shutdown()
+        ce.LOG_WRITER.flush(5)
+        cls.api.close()
+        cls.server.stop()
+        ce.LOG_BASE = cls.log_base
+        shutil.rmtree(cls.dir, ignore_errors=True)
+
+    def _run(self, **params):
+        path = os.path.join(self.dir, f"Ch1_journal_{len(os.listdir(self.dir))}.jsonl")
+        journal = ce.RunJournal(path)
+        raw = dict(ce.merge_channel({"cycles": 3, "dwell_mode": "ready", "wait_time": 0.0,
+                                     "measure_power_curve": False, "retest": True}), **params)
+        journal.write("start", channel=1, params=raw, device_range=[680.0, 960.0])
+        for wl, ok in ((800.0, False), (900.0, False), (850.0, True)):
+            journal.write("attempt", wavelength=wl, success=ok, duration=1.0)
+        journal.close()
+        ce.LOG_WRITER.flush(5)
+        state = ce.load_journal(path)
+        events = []
+        run = ce.ChannelRun(1, state.params, state.device_range, emit=lambda name, *a: events.append((name, a)),
+                            api=self.api, settle_model=ce.SettleTimeModel(), resume=state, log_dir=self.dir,
+                            duration_model=ce.DurationModel())
+        self.assertTrue(self.engine.start(run).wait(60))
+        return run, events
+
+    def test_classifies_systematic_and_intermittent_regions(self):
+        run, events = self._run(retest_repeats=2, retest_radius=0.5)
+        by_lo = {r["lo"]: r for r in run.retest_regions}
+        self.assertEqual(by_lo[800.0]["classification"], "systematic")
+        self.assertEqual(by_lo[900.0]["classification"], "intermittent")
+        self.assertEqual(by_lo[800.0]["fail_rate"], 1.0)
+        self.assertEqual(by_lo[900.0]["fail_rate"], 0.0)
+        self.assertIn("retest_finished", [name for name, _ in events])
+        self.assertEqual(len(run.results), 3)  # re-tests are not results
+
+    def test_zero_repeats_and_negative_radius_are_clamped(self):
+        run, _ = self._run(retest_repeats=0, retest_radius=-3.0)
+        self.assertEqual(sorted(r["repeats"] for r in run.retest_regions), [1, 1])
+
+class _SlowAbortTransport(ce.CronusTransport):
+    """Simulator transport whose abort PUT takes long enough to be cancelled again mid-flight."""
+    def put_json(self, path, payload, timeout=None):
+        if path.endswith("/Abort"):
+            time.sleep(0.5)
+        return super().put_json(path, payload, timeout)
+
+class StopTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = cronus_sim.load_sim_config(None, {"accel": 1000.0, "p_fail_default": 0.0})
+        cls.server = cronus_sim.SimulatorServer(port=0, config=config, seed=6).start()
+        cls.api = _SlowAbortTransport(cls.server.url)
+        cls.engine = ce.TestEngine()
+        cls.dir = tempfile.mkdtemp()
+        cls.log_base = ce.LOG_BASE
+        ce.set_log_dir(cls.dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.shutdown()
+        ce.LOG_WRITER.flush(5)
+        cls.api.close()
+        cls.server.stop()
+        ce.LOG_BASE = cls.log_base
+        shutil.rmtree(cls.dir, ignore_errors=True)
+
+    def test_repeated_cancel_does_not_skip_the_wind_down(self):
+        params = ce.merge_channel({"cycles": None, "dwell_mode": "ready", "wait_time": 0.0,
+                                   "measure_power_curve": False, "abort_on_stop": True})
+        events = []
+        started = threading.Event()
+        def emit(name, *args):
+            events.append(name)
+            if name == "progress_update":
+                started.set()
+        run = ce.ChannelRun(1, params, (680.0, 960.0), emit=emit, api=self.api, settle_model=ce.SettleTimeModel(),
+                            log_dir=self.dir, duration_model=ce.DurationModel())
+        done = self.engine.start(run)
+        self.assertTrue(started.wait(30))
+        self.engine.cancel(run)
+        time.sleep(0.2)  # the abort PUT is now in flight
+        self.engine.cancel(run)
+        self.engine._loop.call_soon_threadsafe(lambda: self.engine._tasks[id(run)].cancel())
+        self.assertTrue(done.wait(10))
+        self.assertEqual(events[-2:], ["finished", "quiesced"])
+        ce.LOG_WRITER.flush(5)
+        with open(run.journal.path, encoding="utf-8") as f:
+            kinds = [json.loads(line)["type"] for line in f]
+        self.assertEqual(kinds[-2:], ["state", "end"])
+        self.assertIsNone(ce.find_resumable_journal(1, self.dir))
+
+if __name__ == "__main__":
+    unittest.main()
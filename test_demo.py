@@ -0,0 +1,84 @@
+"""GUI plumbing tests, run offscreen: python -m unittest (or pytest) from the repository root."""
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+try:
+    from PyQt6.QtCore import QObject, pyqtSignal
+    from PyQt6.QtWidgets import QApplication
+except ImportError:  # headless stations run the engine tests only
+    QApplication = None
+
+if QApplication is not None:
+    import demo
+    import cronus_engine as ce
+
+    class _Sink(QObject):
+        a = pyqtSignal(str)
+        b = pyqtSignal(int)
+
+@unittest.skipIf(QApplication is None, "PyQt6 is not installed")
+class UpdateBusTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_keyed_posts_coalesce_and_unkeyed_keep_order(self):
+        bus = demo.UpdateBus()
+        sink = _Sink()
+        got = []
+        sink.a.connect(lambda v: got.append(("a", v)))
+        sink.b.connect(lambda v: got.append(("b", v)))
+        bus.post(sink.a, ("first",))
+        for i in range(5):
+            bus.post(sink.b, (i,), key="progress")
+        bus.post(sink.a, ("second",))
+        bus.post(sink.b, (9,), key="log", keep=3)
+        bus.post(sink.b, (10,), key="log", keep=3)
+        bus._flush()
+        self.assertEqual([v for k, v in got if k == "a"], ["first", "second"])
+        self.assertEqual([v for k, v in got if k == "b"], [4, 9, 10])
+        self.assertLess(got.index(("a", "first")), got.index(("a", "second")))
+
+    def test_keep_limits_the_backlog(self):
+        bus = demo.UpdateBus()
+        sink = _Sink()
+        got = []
+        sink.b.connect(got.append)
+        for i in range(10):
+            bus.post(sink.b, (i,), key="cmd", keep=5)
+        bus._flush()
+        self.assertEqual(got, [5, 6, 7, 8, 9])
+
+@unittest.skipIf(QApplication is None, "PyQt6 is not installed")
+class ChannelPanelTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_retest_display_starts_on_a_coalesced_tick(self):
+        panel = demo.ChannelPanel(1, lambda ch: ce.merge_channel({}), lambda ch: (700.0, 900.0))
+        panel.progress_bar.setMaximum(12)  # cycle count, not the re-test total
+        panel._set_status("Running")
+        panel.on_retest_progress(4, 30)  # ticks 1-3 were coalesced away
+        self.assertEqual(panel.status_pill.text(), "Re-testing")
+        self.assertEqual(panel.progress_bar.maximum(), 30)
+        self.assertEqual(panel.progress_bar.value(), 4)
+
+    def test_stop_while_stopping_does_not_cancel_again(self):
+        panel = demo.ChannelPanel(1, lambda ch: ce.merge_channel({}), lambda ch: (700.0, 900.0))
+        stops = []
+        class _Worker:
+            def isRunning(self):
+                return True
+            def stop(self):
+                stops.append(1)
+        panel.worker = _Worker()
+        panel.on_stop()
+        panel.on_stop()
+        panel.on_reset()
+        self.assertEqual(len(stops), 1)
+        self.assertEqual(panel.status_pill.text(), "Stopping")
+
+if __name__ == "__main__":
+    unittest.main()